@@ -1,27 +1,49 @@
 import streamlit as st
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-import os
-import math
-import docx
-import PyPDF2
+import importlib
+import threading
 import time
-from docx import Document
 import datetime
 from dotenv import load_dotenv
 
-# DOCX formatting helpers
-from docx.shared import Pt
-from docx.enum.text import WD_LINE_SPACING
-from docx.enum.table import WD_CELL_VERTICAL_ALIGNMENT
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+# Load .env before importing bloomgen, which reads its BLOOMGEN_* settings at import.
+load_dotenv()
 
-import pandas as pd
+# =========================
+# Deferred Imports
+# =========================
+# The login and home pages need nothing beyond Streamlit, and the generation
+# pages only the bloomgen modules; pandas (for tables), PyPDF2 and the LangChain
+# stack load on first use. A background thread starts loading all of them once
+# any page has been drawn, so the first preview or generation rarely waits.
+GENERATION_MODULES = [
+    "pandas",
+    "PyPDF2",
+    "langchain_core.output_parsers",
+    "langchain_core.prompts",
+    "langchain_groq",
+    "langchain_text_splitters",
+    "bloomgen.bank",
+    "bloomgen.cache",
+    "bloomgen.classify",
+    "bloomgen.docx_render",
+    "bloomgen.extract",
+    "bloomgen.generation",
+    "bloomgen.jobs",
+    "bloomgen.pdf_render"
+]
+
+
+@st.cache_resource(show_spinner=False)
+def preload_generation_modules():
+    # Cached per server process: one loader thread, not one per session or rerun.
+    def load():
+        for name in GENERATION_MODULES:
+            importlib.import_module(name)
+
+    thread = threading.Thread(target=load, name="bloomgen-preload", daemon=True)
+    thread.start()
+    return thread
 
-load_dotenv()
 
 # =========================
 # LOGIN SYSTEM
@@ -44,8 +66,14 @@ if "mode" not in st.session_state:
 if "preview_rows" not in st.session_state:
     st.session_state.preview_rows = None
 
-if "generated_docx_path" not in st.session_state:
-    st.session_state.generated_docx_path = None
+if "generated_files" not in st.session_state:
+    st.session_state.generated_files = None
+
+if "job_id" not in st.session_state:
+    st.session_state.job_id = None
+
+if "run_profile" not in st.session_state:
+    st.session_state.run_profile = None
 
 # =========================
 # LOGIN PAGE
@@ -78,14 +106,16 @@ else:
         st.session_state.role = None
         st.session_state.mode = None
         st.session_state.preview_rows = None
-        st.session_state.generated_docx_path = None
+        st.session_state.generated_files = None
+        st.session_state.job_id = None
         st.rerun()
 
     if st.session_state.mode is not None:
         if st.sidebar.button("⬅ Back to Home"):
             st.session_state.mode = None
             st.session_state.preview_rows = None
-            st.session_state.generated_docx_path = None
+            st.session_state.generated_files = None
+            st.session_state.job_id = None
             st.rerun()
 
     # =========================
@@ -118,422 +148,157 @@ else:
     # COMMON SETUP
     # =========================
     else:
-        llm = ChatGroq(
-            groq_api_key=os.getenv("GROQ_API_KEY"),
-            model_name="openai/gpt-oss-120b",
-            temperature=0.4,
-            max_tokens=1200
+        from bloomgen.bank import QUESTION_BANK_ENABLED, get_question_bank
+        from bloomgen.cache import content_hash, get_artifact_store, get_extraction_cache, get_summary_cache
+        from bloomgen.classify import bloom_mismatches, mismatch_warning, relabel_pairs
+        from bloomgen.docx_render import (
+            DOCX_MIME,
+            assignment_file_name,
+            generate_question_paper_docx,
+            generate_university_docx,
+            question_paper_file_name
         )
+        from bloomgen.extract import extract_text
+        from bloomgen.generation import (
+            assignment_row,
+            build_question_paper_rows,
+            compute_bloom_counts,
+            generate_paper_sections,
+            generate_questions,
+            normalize_bloom_percentages,
+            question_paper_section_specs
+        )
+        from bloomgen.jobs import ACTIVE_STATUSES, JOB_STALL_SECONDS, get_job_runner
+        from bloomgen.pdf_render import PDF_MIME, generate_assignment_pdf, generate_question_paper_pdf
 
         # =========================
-        # Safe Retry Wrapper
-        # =========================
-        def safe_llm_invoke(chain, payload, retries=3, delay=2):
-            for attempt in range(retries):
-                try:
-                    return chain.invoke(payload)
-                except Exception as e:
-                    error_text = str(e).lower()
-                    if (
-                        "503" in error_text
-                        or "over capacity" in error_text
-                        or "internalservererror" in error_text
-                        or "service unavailable" in error_text
-                    ):
-                        if attempt < retries - 1:
-                            wait_time = delay * (2 ** attempt)
-                            time.sleep(wait_time)
-                            continue
-                    raise
-
-        # =========================
-        # File Text Extraction
-        # =========================
-        def extract_text(uploaded_file):
-            text = ""
-            if uploaded_file is None:
-                return text
-
-            filename = uploaded_file.name.lower()
-
-            if filename.endswith(".pdf"):
-                reader = PyPDF2.PdfReader(uploaded_file)
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-
-            elif filename.endswith(".docx"):
-                doc = docx.Document(uploaded_file)
-                for para in doc.paragraphs:
-                    text += para.text + "\n"
-
-            return text
-
-        # =========================
-        # Syllabus Chunking Helpers
-        # =========================
-        def split_syllabus(text: str, chunk_size: int = 2400, chunk_overlap: int = 200):
-            splitter = RecursiveCharacterTextSplitter(
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap
-            )
-            return splitter.split_text(text or "")
-
-        def safe_join(parts, sep="\n\n"):
-            return sep.join([p for p in parts if p and p.strip()])
-
-        # =========================
-        # Summary Chain
+        # Cache Stats
         # =========================
-        summary_prompt = ChatPromptTemplate.from_template("""
-You are helping create university exam/assignment questions.
-
-Summarize the syllabus into compact bullet points (max 350 words).
-Keep only exam-relevant units/topics/subtopics/keywords.
-No extra explanation.
+        def show_cache_stats():
+            extraction = get_extraction_cache().stats()
+            summaries = get_summary_cache().stats()
+            artifacts = get_artifact_store().stats()
+            bank = get_question_bank().stats()
+            with st.sidebar.expander("Cache stats"):
+                st.caption(
+                    f"Extraction: {extraction['hit_rate']:.0%} hit rate "
+                    f"({extraction['memory_hits']} memory, {extraction['disk_hits']} disk, "
+                    f"{extraction['misses']} misses), "
+                    f"{extraction['parses']} parses, avg {extraction['parse_seconds_avg']:.2f}s"
+                )
+                st.caption(
+                    f"Summaries: {summaries['hit_rate']:.0%} hit rate "
+                    f"({summaries['hits']} hits, {summaries['misses']} misses, {summaries['entries']} cached)"
+                )
+                st.caption(
+                    f"Documents: {artifacts['entries']} stored, {artifacts['bytes'] / (1024 * 1024):.1f} MB"
+                )
+                st.caption(
+                    f"Question bank: {bank['questions']} questions across {bank['subjects']} subjects, "
+                    f"{bank['served']} served"
+                )
 
-SYLLABUS:
-{syllabus}
-""")
-        summary_chain = summary_prompt | llm | StrOutputParser()
+        # Called after follow_job, so a run that just finished shows up in the same script run.
+        # The profile only exists when BLOOMGEN_TRACE=1.
+        def show_run_profile():
+            if not st.session_state.run_profile:
+                return
+            with st.sidebar.expander("Last run profile"):
+                profile = st.session_state.run_profile
+                st.caption(
+                    f"{sum(r['prompt_tokens'] for r in profile)} prompt + "
+                    f"{sum(r['completion_tokens'] for r in profile)} completion tokens, "
+                    f"${sum(r['cost_usd'] for r in profile):.4f}. Stages nest, so their seconds overlap."
+                )
+                st.dataframe(profile, use_container_width=True, hide_index=True)
 
         # =========================
-        # Bloom Count Helper
+        # Background Jobs
         # =========================
-        def compute_bloom_counts(total_questions: int, pct_u: int, pct_a: int, pct_ae: int):
-            u = round(total_questions * pct_u / 100)
-            a = round(total_questions * pct_a / 100)
-            ae = total_questions - u - a
+        # Generation runs as a job on a worker pool that outlives this script run.
+        # A rerun (any widget interaction) or reconnect just re-attaches to the job
+        # by ID and keeps polling, instead of throwing away in-flight LLM calls.
+        job_runner = get_job_runner()
+        JOB_POLL_SECONDS = 0.5
+
+        def format_progress(done, targets):
+            return " · ".join(f"{name} {done.get(name, 0)}/{n}" for name, n in targets.items() if n > 0)
+
+        def follow_job(spinner_text, failure_text):
+            job_id = st.session_state.job_id
+            live_progress = st.empty()
+            live_table = st.empty()
+            last_update = None
+
+            with st.spinner(spinner_text):
+                while True:
+                    job = job_runner.get(job_id)
+                    if job is None or job["status"] not in ACTIVE_STATUSES:
+                        break
+                    # A job whose worker died writes nothing more; stop waiting on it.
+                    if time.time() - job["updated"] > JOB_STALL_SECONDS:
+                        break
+
+                    progress = job["progress"]
+                    if progress and job["updated"] != last_update:
+                        last_update = job["updated"]
+                        live_progress.caption(format_progress(progress["done"], progress["targets"]))
+                        live_table.dataframe(progress["rows"], use_container_width=True)
+
+                    time.sleep(JOB_POLL_SECONDS)
+
+            live_progress.empty()
+            live_table.empty()
+            st.session_state.job_id = None
+
+            if job is None:
+                st.error(f"{failure_text}: job {job_id} no longer exists")
+                return
+            if job["status"] == "failed":
+                st.error(f"{failure_text}: {job['error']}")
+                return
+            if job["status"] in ACTIVE_STATUSES:
+                st.error(f"{failure_text}: job {job_id} made no progress for {JOB_STALL_SECONDS // 60} minutes")
+                return
+
+            result = job["result"]
+            st.session_state.run_profile = result.get("profile")
+            for section_name, error in sorted(result.get("errors", {}).items()):
+                st.error(f"Section {section_name} generation failed: {error}")
+            if result.get("errors"):
+                return
+
+            for warning in result.get("warnings", []):
+                st.warning(warning)
+
+            generated_files = []
+            for stored in result["files"]:
+                data = get_artifact_store().get(stored["artifact_id"])
+                if data is None:
+                    st.error(f"{failure_text}: the generated document has expired, please generate it again")
+                    return
+                generated_files.append({**stored, "data": data})
+
+            st.session_state.preview_rows = result["rows"]
+            st.session_state.generated_files = generated_files
+
+        def stored_file(file_format, data, file_name, mime):
+            # Job results stay JSON: documents go to the artifact store and only their ids come back.
             return {
-                "Understand": max(0, u),
-                "Apply": max(0, a),
-                "Analyze/Evaluate": max(0, ae)
-            }
-
-        # =========================
-        # Assignment Question Generator
-        # =========================
-        def generate_questions(subject, syllabus, count, pct_u, pct_a, pct_ae):
-            chunks = split_syllabus(syllabus, chunk_size=2400, chunk_overlap=200)
-
-            summaries = []
-            for ch in chunks[:6]:
-                summaries.append(safe_llm_invoke(summary_chain, {"syllabus": ch}))
-            syllabus_summary = safe_join(summaries)
-
-            bloom_counts = compute_bloom_counts(count, pct_u, pct_a, pct_ae)
-
-            bloom_prompt = ChatPromptTemplate.from_template("""
-You are an academic question paper setter.
-
-Generate exactly {count} university-level descriptive questions.
-
-Subject: {subject}
-Bloom Bucket: {bloom_bucket}
-
-STRICT OUTPUT RULES:
-- Output ONLY questions.
-- One question per line.
-- No numbering, no bullets, no headings, no blank lines.
-- Keep questions exam-oriented and concise.
-- Use action verbs that match the Bloom bucket:
-  - Understand: Explain, Describe, Illustrate, Summarize
-  - Apply: Solve, Demonstrate, Implement, Apply
-  - Analyze/Evaluate: Analyze, Compare, Differentiate, Evaluate, Justify
-
-Syllabus Summary (use ONLY this):
-{syllabus}
-""")
-            bloom_chain = bloom_prompt | llm | StrOutputParser()
-
-            batch_size = 6
-            final_pairs = []
-
-            for bloom_bucket, bucket_count in bloom_counts.items():
-                if bucket_count <= 0:
-                    continue
-
-                rounds = math.ceil(bucket_count / batch_size)
-
-                for i in range(rounds):
-                    this_batch = batch_size if i < rounds - 1 else (bucket_count - batch_size * i)
-
-                    out = safe_llm_invoke(
-                        bloom_chain,
-                        {
-                            "subject": subject,
-                            "syllabus": syllabus_summary,
-                            "count": this_batch,
-                            "bloom_bucket": bloom_bucket
-                        }
-                    )
-
-                    for line in out.split("\n"):
-                        q = line.strip().lstrip("-•").strip()
-                        if q:
-                            final_pairs.append((q, bloom_bucket))
-
-            return final_pairs[:count]
-
-        # =========================
-        # Question Paper Generators
-        # =========================
-        def generate_section_questions(subject, unit_text, count, marks, style, bloom_hint):
-            chunks = split_syllabus(unit_text, chunk_size=2200, chunk_overlap=150)
-
-            summaries = []
-            for ch in chunks[:2]:
-                summaries.append(safe_llm_invoke(summary_chain, {"syllabus": ch}))
-
-            unit_summary = safe_join(summaries)
-
-            prompt = ChatPromptTemplate.from_template("""
-You are a university exam question setter.
-
-Generate exactly {count} questions.
-
-Subject: {subject}
-Marks per Question: {marks}
-Question Style: {style}
-Bloom Level: {bloom_hint}
-
-RULES:
-- Output only questions
-- One question per line
-- No numbering
-- No bullets
-- No headings
-- Questions must be suitable for {marks} marks
-- Keep the style aligned to {style}
-
-Unit Summary:
-{unit_summary}
-""")
-
-            chain = prompt | llm | StrOutputParser()
-
-            result = safe_llm_invoke(
-                chain,
-                {
-                    "subject": subject,
-                    "count": count,
-                    "marks": marks,
-                    "style": style,
-                    "bloom_hint": bloom_hint,
-                    "unit_summary": unit_summary
-                }
-            )
-
-            questions = []
-            for line in result.split("\n"):
-                q = line.strip().lstrip("-•").strip()
-                if q:
-                    questions.append(q)
-
-            return questions[:count]
-
-        # =========================
-        # CO / PO Helpers
-        # =========================
-        def assign_co(index: int, total_cos: int) -> str:
-            return f"CO{(index % total_cos) + 1}" if total_cos > 0 else ""
-
-        def assign_po(index: int, total_pos: int) -> str:
-            return f"PO{(index % total_pos) + 1}" if total_pos > 0 else ""
-
-        def marks_for_bloom(bloom_label: str, m_u: int, m_a: int, m_ae: int) -> str:
-            if bloom_label == "Understand":
-                return str(m_u)
-            if bloom_label == "Apply":
-                return str(m_a)
-            return str(m_ae)
-
-        # =========================
-        # DOCX Formatting Helpers
-        # =========================
-        DOC_FONT_NAME = "Calibri"
-        DOC_FONT_SIZE_PT = 11
-        ROW_HEIGHT_PT = 24
-
-        def set_cell_text(cell, text: str, bold: bool = False):
-            cell.text = ""
-            p = cell.paragraphs[0]
-
-            p.paragraph_format.space_before = Pt(0)
-            p.paragraph_format.space_after = Pt(0)
-            p.paragraph_format.line_spacing_rule = WD_LINE_SPACING.SINGLE
-            p.paragraph_format.line_spacing = 1.0
-
-            run = p.add_run(text)
-            run.bold = bold
-            run.font.name = DOC_FONT_NAME
-            run.font.size = Pt(DOC_FONT_SIZE_PT)
-
-            rPr = run._element.get_or_add_rPr()
-            rFonts = rPr.find(qn("w:rFonts"))
-            if rFonts is None:
-                rFonts = OxmlElement("w:rFonts")
-                rPr.append(rFonts)
-            rFonts.set(qn("w:ascii"), DOC_FONT_NAME)
-            rFonts.set(qn("w:hAnsi"), DOC_FONT_NAME)
-
-            cell.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
-
-        def set_row_height(row, height_pt: int):
-            tr = row._tr
-            trPr = tr.get_or_add_trPr()
-            trHeight = OxmlElement("w:trHeight")
-            trHeight.set(qn("w:val"), str(int(height_pt * 20)))
-            trHeight.set(qn("w:hRule"), "exact")
-            trPr.append(trHeight)
-
-        # =========================
-        # Assignment DOCX Generator
-        # =========================
-        def generate_university_docx(
-            data_dict,
-            questions_list,
-            bloom_labels,
-            total_cos,
-            total_pos,
-            m_u,
-            m_a,
-            m_ae
-        ):
-            BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-            template_path = os.path.join(BASE_DIR, "templates", "assignment_template.docx")
-
-            doc = Document(template_path)
-
-            for paragraph in doc.paragraphs:
-                for key, value in data_dict.items():
-                    if key in paragraph.text:
-                        paragraph.text = paragraph.text.replace(key, str(value))
-
-            question_table = None
-            for table in doc.tables:
-                if table.rows and "Question No." in table.rows[0].cells[0].text:
-                    question_table = table
-                    break
-
-            if question_table:
-                q_no = 1
-                for idx, q in enumerate(questions_list):
-                    q = q.strip()
-                    if not q:
-                        continue
-
-                    bloom_label = bloom_labels[idx] if idx < len(bloom_labels) else "Understand"
-
-                    new_row = question_table.add_row()
-                    set_row_height(new_row, ROW_HEIGHT_PT)
-                    cells = new_row.cells
-
-                    set_cell_text(cells[0], f"Q{q_no}")
-                    set_cell_text(cells[1], q)
-                    set_cell_text(cells[2], assign_co(idx, total_cos))
-                    set_cell_text(cells[3], assign_po(idx, total_pos))
-                    set_cell_text(cells[4], bloom_label)
-                    set_cell_text(cells[5], marks_for_bloom(bloom_label, m_u, m_a, m_ae))
-
-                    q_no += 1
-
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
-            safe_subject = "".join(
-                [c for c in (data_dict.get("{{SUBJECT}}", "") or "Subject") if c.isalnum() or c in (" ", "_", "-")]
-            ).strip()
-            safe_subject = safe_subject.replace(" ", "_")[:40] or "Subject"
-
-            output_path = os.path.join(BASE_DIR, f"University_Assignment_{safe_subject}_{timestamp}.docx")
-            doc.save(output_path)
-            return output_path
-
-        # =========================
-        # Question Paper DOCX Generator
-        # =========================
-        def generate_question_paper_docx(data_dict, all_rows):
-            BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-            template_path = os.path.join(BASE_DIR, "templates", "question_paper_template.docx")
-
-            doc = Document(template_path)
-
-            replacements = {
-                "{{DEPARTMENT}}": data_dict.get("department", ""),
-                "{{SEMESTER}}": data_dict.get("semester", ""),
-                "{{ACADEMIC_YEAR}}": data_dict.get("academic_year", ""),
-                "{{MAX_MARKS}}": data_dict.get("total_marks", ""),
-                "{{COURSE_NAME}}": data_dict.get("course_name", ""),
-                "{{COURSE_CODE}}": data_dict.get("course_code", ""),
-                "{{SUBJECT_TEACHER}}": data_dict.get("subject_teacher", ""),
-                "{{DURATION}}": data_dict.get("duration", ""),
-                "{{DATE}}": str(data_dict.get("date", "")),
-                "{{EXAMINATION_DATE}}": str(data_dict.get("exam_date", "")),
-                "{{SUBJECT_INCHARGE}}": data_dict.get("subject_incharge", ""),
-                "{{ACADEMIC_COORDINATOR}}": data_dict.get("academic_coordinator", ""),
-                "{{HOD_NAME}}": data_dict.get("hod_name", "")
+                "format": file_format,
+                "artifact_id": get_artifact_store().put(data),
+                "file_name": file_name,
+                "mime": mime
             }
 
-            # Replace header placeholders in paragraphs
-            for paragraph in doc.paragraphs:
-                for key, value in replacements.items():
-                    if key in paragraph.text:
-                        paragraph.text = paragraph.text.replace(key, str(value))
-
-            # Replace placeholders inside tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.paragraphs:
-                            for key, value in replacements.items():
-                                if key in paragraph.text:
-                                    paragraph.text = paragraph.text.replace(key, str(value))
-
-            # Split rows by section
-            sections = {
-                "A": [],
-                "B": [],
-                "C": [],
-                "D": [],
-                "E": []
-            }
-
-            for row in all_rows:
-                sections[row["Section"]].append(row)
-
-            # Assumes:
-            # table 0 = logo/header
-            # table 1 = meta info
-            # table 2 = section A table
-            # table 3 = section B table
-            # table 4 = section C table
-            # table 5 = section D table
-            # table 6 = section E table
-            section_tables = doc.tables[2:]
-            section_order = ["A", "B", "C", "D", "E"]
-
-            for i, sec in enumerate(section_order):
-                if i >= len(section_tables):
-                    break
-
-                table = section_tables[i]
-
-                for row_data in sections[sec]:
-                    new_row = table.add_row()
-                    set_row_height(new_row, ROW_HEIGHT_PT)
-                    cells = new_row.cells
-
-                    set_cell_text(cells[0], row_data["Question No."])
-                    set_cell_text(cells[1], row_data["Question Statement"])
-                    set_cell_text(cells[2], row_data["CO"])
-                    set_cell_text(cells[3], row_data["PO"])
-                    set_cell_text(cells[4], row_data["Bloom’s Level"])
-                    set_cell_text(cells[5], row_data["Marks"])
-
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
-            output_path = os.path.join(BASE_DIR, f"Question_Paper_{timestamp}.docx")
-            doc.save(output_path)
-            return output_path
+        def show_download_buttons(document_label):
+            for generated in st.session_state.generated_files or []:
+                st.download_button(
+                    label=f"⬇ Download {document_label} {generated['format']}",
+                    data=generated["data"],
+                    file_name=generated["file_name"],
+                    mime=generated["mime"]
+                )
 
         # =========================
         # ASSIGNMENT MODE
@@ -563,14 +328,9 @@ Unit Summary:
             pct_apply = st.sidebar.slider("Apply %", 0, 100, 30)
             pct_analyze_eval = st.sidebar.slider("Analyze/Evaluate %", 0, 100, 40)
 
-            total_pct = pct_understand + pct_apply + pct_analyze_eval
-            if total_pct == 0:
-                pct_understand, pct_apply, pct_analyze_eval = 30, 30, 40
-                total_pct = 100
-
-            pct_understand = round((pct_understand / total_pct) * 100)
-            pct_apply = round((pct_apply / total_pct) * 100)
-            pct_analyze_eval = 100 - pct_understand - pct_apply
+            pct_understand, pct_apply, pct_analyze_eval = normalize_bloom_percentages(
+                pct_understand, pct_apply, pct_analyze_eval
+            )
 
             st.sidebar.caption(
                 f"Final split: Understand {pct_understand}%, Apply {pct_apply}%, Analyze/Evaluate {pct_analyze_eval}%"
@@ -591,6 +351,14 @@ Unit Summary:
 
             uploaded_file = st.file_uploader("Upload Syllabus (PDF/DOCX)", key="assignment_upload")
 
+            use_bank = st.sidebar.checkbox(
+                "Reuse questions from the question bank", value=QUESTION_BANK_ENABLED, key="assignment_use_bank"
+            )
+            relabel = st.sidebar.checkbox(
+                "Relabel Bloom levels the local classifier disagrees with", value=False, key="assignment_relabel"
+            )
+            show_cache_stats()
+
             col1, col2 = st.columns(2)
 
             with col1:
@@ -600,51 +368,25 @@ Unit Summary:
 
             if clear_preview:
                 st.session_state.preview_rows = None
-                st.session_state.generated_docx_path = None
+                st.session_state.generated_files = None
+                st.session_state.job_id = None
+                st.session_state.run_profile = None
                 st.rerun()
 
             if uploaded_file and generate_preview:
-                syllabus_text = extract_text(uploaded_file)
-
                 if not subject:
                     st.error("Please enter subject name")
                     st.stop()
 
-                with st.spinner("Generating preview..."):
-                    pairs = generate_questions(
-                        subject,
-                        syllabus_text,
-                        question_count,
-                        pct_understand,
-                        pct_apply,
-                        pct_analyze_eval
-                    )
+                bucket_targets = compute_bloom_counts(question_count, pct_understand, pct_apply, pct_analyze_eval)
 
-                questions_list = [q for (q, b) in pairs][:question_count]
-                bloom_labels = [b for (q, b) in pairs][:question_count]
-
-                while len(questions_list) < question_count:
-                    questions_list.append("Explain a relevant concept from the given syllabus.")
-                    bloom_labels.append("Understand")
-
-                rows = []
-                for i, q in enumerate(questions_list, start=1):
-                    bloom = bloom_labels[i - 1]
-                    rows.append({
-                        "Question No.": f"Q{i}",
-                        "Question Statement": q,
-                        "CO": assign_co(i - 1, int(total_cos)),
-                        "PO": assign_po(i - 1, int(total_pos)),
-                        "Bloom’s Level": bloom,
-                        "Marks": marks_for_bloom(
-                            bloom,
-                            int(m_understand),
-                            int(m_apply),
-                            int(m_analyze_eval)
-                        )
-                    })
-
-                st.session_state.preview_rows = rows
+                row_settings = (
+                    int(total_cos),
+                    int(total_pos),
+                    int(m_understand),
+                    int(m_apply),
+                    int(m_analyze_eval)
+                )
 
                 today = datetime.date.today()
                 data = {
@@ -663,33 +405,85 @@ Unit Summary:
                     "{{HOD_NAME}}": hod_name
                 }
 
-                docx_path = generate_university_docx(
-                    data,
-                    questions_list,
-                    bloom_labels,
-                    int(total_cos),
-                    int(total_pos),
-                    int(m_understand),
-                    int(m_apply),
-                    int(m_analyze_eval)
+                def run_assignment_job(report):
+                    live_rows = []
+                    bucket_done = {}
+
+                    def on_question(q, bloom):
+                        bucket_done[bloom] = bucket_done.get(bloom, 0) + 1
+                        live_rows.append(assignment_row(len(live_rows) + 1, q, bloom, *row_settings))
+                        report({"rows": live_rows, "done": bucket_done, "targets": bucket_targets})
+
+                    pairs = generate_questions(
+                        subject,
+                        extract_text(uploaded_file),
+                        question_count,
+                        pct_understand,
+                        pct_apply,
+                        pct_analyze_eval,
+                        on_question=on_question,
+                        use_bank=use_bank
+                    )
+                    if relabel:
+                        pairs = relabel_pairs(pairs)
+
+                    questions_list = [q for (q, b) in pairs][:question_count]
+                    bloom_labels = [b for (q, b) in pairs][:question_count]
+
+                    warnings = []
+                    if len(questions_list) < question_count:
+                        warnings.append(
+                            f"The model returned {len(questions_list)} of {question_count} requested questions. "
+                            "Generate the preview again to top up the rest."
+                        )
+
+                    rows = [
+                        assignment_row(i, q, bloom_labels[i - 1], *row_settings)
+                        for i, q in enumerate(questions_list, start=1)
+                    ]
+                    bloom_warning = mismatch_warning(bloom_mismatches(rows))
+                    if bloom_warning:
+                        warnings.append(bloom_warning)
+
+                    docx_bytes = generate_university_docx(
+                        data,
+                        questions_list,
+                        bloom_labels,
+                        *row_settings,
+                        font_name=DOC_FONT_NAME,
+                        font_size_pt=DOC_FONT_SIZE_PT,
+                        row_height_pt=ROW_HEIGHT_PT
+                    )
+                    pdf_bytes = generate_assignment_pdf(
+                        data, rows, font_name=DOC_FONT_NAME, font_size_pt=DOC_FONT_SIZE_PT
+                    )
+                    return {
+                        "rows": rows,
+                        "files": [
+                            stored_file("DOCX", docx_bytes, assignment_file_name(subject), DOCX_MIME),
+                            stored_file("PDF", pdf_bytes, assignment_file_name(subject, "pdf"), PDF_MIME)
+                        ],
+                        "warnings": warnings
+                    }
+
+                fingerprint = content_hash(
+                    "assignment", uploaded_file.getvalue(), data, question_count, bucket_targets,
+                    total_cos, total_pos, m_understand, m_apply, m_analyze_eval,
+                    DOC_FONT_NAME, DOC_FONT_SIZE_PT, ROW_HEIGHT_PT, use_bank, relabel
                 )
-                st.session_state.generated_docx_path = docx_path
+                st.session_state.job_id = job_runner.submit("assignment", fingerprint, run_assignment_job)
+
+            if st.session_state.job_id:
+                follow_job("Generating preview...", "Preview generation failed")
+            show_run_profile()
 
             if st.session_state.preview_rows:
                 st.subheader("📋 Preview (PCU Table)")
-                df = pd.DataFrame(st.session_state.preview_rows)
-                st.dataframe(df, use_container_width=True)
+                st.dataframe(st.session_state.preview_rows, use_container_width=True)
 
                 st.success("Preview ready. If it looks good, download below 👇")
 
-                if st.session_state.generated_docx_path:
-                    with open(st.session_state.generated_docx_path, "rb") as f:
-                        st.download_button(
-                            label="⬇ Download University Assignment DOCX",
-                            data=f,
-                            file_name=os.path.basename(st.session_state.generated_docx_path),
-                            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                        )
+                show_download_buttons("University Assignment")
             else:
                 st.info("Upload a syllabus and click **Generate Preview** to see the table before downloading.")
 
@@ -719,6 +513,11 @@ Unit Summary:
             total_cos_qp = st.sidebar.number_input("Total COs", min_value=1, max_value=20, value=6, step=1, key="qp_total_cos")
             total_pos_qp = st.sidebar.number_input("Total POs", min_value=1, max_value=20, value=12, step=1, key="qp_total_pos")
 
+            use_bank_qp = st.sidebar.checkbox(
+                "Reuse questions from the question bank", value=QUESTION_BANK_ENABLED, key="qp_use_bank"
+            )
+            show_cache_stats()
+
             st.subheader("Upload Unit-wise PDFs / DOCX")
             st.caption("Upload one file for each unit")
 
@@ -744,7 +543,9 @@ Unit Summary:
 
             if qp_clear:
                 st.session_state.preview_rows = None
-                st.session_state.generated_docx_path = None
+                st.session_state.generated_files = None
+                st.session_state.job_id = None
+                st.session_state.run_profile = None
                 st.rerun()
 
             if qp_preview:
@@ -771,71 +572,11 @@ Unit Summary:
                     st.error("Please fill/upload: " + ", ".join(missing))
                     st.stop()
 
-                try:
-                    with st.spinner("Generating question paper..."):
-                        unit1_text = extract_text(unit1_file)
-                        unit2_text = extract_text(unit2_file)
-                        unit3_text = extract_text(unit3_file)
-                        unit4_text = extract_text(unit4_file)
-                        unit5_text = extract_text(unit5_file)
-
-                        sec_a = generate_section_questions(
-                            course_name, unit1_text, 3, 2, "brief answer", "Understand"
-                        )
-                        sec_b = generate_section_questions(
-                            course_name, unit2_text, 3, 2, "brief answer", "Apply"
-                        )
-                        sec_c = generate_section_questions(
-                            course_name, unit3_text, 3, 5, "descriptive", "Analyze/Evaluate"
-                        )
-                        sec_d = generate_section_questions(
-                            course_name, unit4_text, 3, 5, "descriptive", "Analyze/Evaluate"
-                        )
-                        sec_e = generate_section_questions(
-                            course_name, unit5_text, 2, 10, "long answer", "Analyze/Evaluate"
-                        )
-                except Exception as e:
-                    st.error(f"Question paper generation failed: {str(e)}")
-                    st.stop()
+                section_specs = question_paper_section_specs(
+                    [unit1_file, unit2_file, unit3_file, unit4_file, unit5_file]
+                )
 
-                while len(sec_a) < 3:
-                    sec_a.append("Explain an important concept from Unit 1.")
-                while len(sec_b) < 3:
-                    sec_b.append("Explain an important concept from Unit 2.")
-                while len(sec_c) < 3:
-                    sec_c.append("Discuss an important concept from Unit 3.")
-                while len(sec_d) < 3:
-                    sec_d.append("Discuss an important concept from Unit 4.")
-                while len(sec_e) < 2:
-                    sec_e.append("Explain an important concept from Unit 5 in detail.")
-
-                preview_rows = []
-
-                all_sections = [
-                    ("A", sec_a, 2, "Understand"),
-                    ("B", sec_b, 2, "Apply"),
-                    ("C", sec_c, 5, "Analyze/Evaluate"),
-                    ("D", sec_d, 5, "Analyze/Evaluate"),
-                    ("E", sec_e, 10, "Analyze/Evaluate")
-                ]
-
-                q_no = 1
-                idx_counter = 0
-                for section_name, section_questions, marks, bloom_label in all_sections:
-                    for q in section_questions:
-                        preview_rows.append({
-                            "Section": section_name,
-                            "Question No.": f"Q{q_no}",
-                            "Question Statement": q,
-                            "CO": assign_co(idx_counter, int(total_cos_qp)),
-                            "PO": assign_po(idx_counter, int(total_pos_qp)),
-                            "Bloom’s Level": bloom_label,
-                            "Marks": str(marks)
-                        })
-                        q_no += 1
-                        idx_counter += 1
-
-                st.session_state.preview_rows = preview_rows
+                section_targets = {spec[0]: spec[2] for spec in section_specs}
 
                 today = datetime.date.today()
 
@@ -855,23 +596,64 @@ Unit Summary:
                     "hod_name": hod_name_qp
                 }
 
-                qp_docx_path = generate_question_paper_docx(qp_data, preview_rows)
-                st.session_state.generated_docx_path = qp_docx_path
+                def run_question_paper_job(report):
+                    section_rows = {}
+                    live_lock = threading.Lock()
+
+                    # Called from every section's worker thread at once; each call
+                    # reports a snapshot built under the lock.
+                    def on_question(section_name, q):
+                        with live_lock:
+                            section_rows.setdefault(section_name, []).append(
+                                {"Section": section_name, "Question Statement": q}
+                            )
+                            report({
+                                "rows": [row for name in sorted(section_rows) for row in section_rows[name]],
+                                "done": {name: len(rows) for name, rows in section_rows.items()},
+                                "targets": section_targets
+                            })
+
+                    section_results, section_errors = generate_paper_sections(
+                        course_name, section_specs, on_question=on_question, use_bank=use_bank_qp
+                    )
+
+                    if section_errors:
+                        return {"errors": section_errors}
+
+                    preview_rows = build_question_paper_rows(
+                        section_results, int(total_cos_qp), int(total_pos_qp)
+                    )
+
+                    qp_docx_bytes = generate_question_paper_docx(qp_data, preview_rows)
+                    qp_pdf_bytes = generate_question_paper_pdf(qp_data, preview_rows)
+                    return {
+                        "rows": preview_rows,
+                        "files": [
+                            stored_file("DOCX", qp_docx_bytes, question_paper_file_name(), DOCX_MIME),
+                            stored_file("PDF", qp_pdf_bytes, question_paper_file_name("pdf"), PDF_MIME)
+                        ],
+                        "warnings": [w for w in [mismatch_warning(bloom_mismatches(preview_rows))] if w]
+                    }
+
+                fingerprint = content_hash(
+                    "question_paper", qp_data, total_cos_qp, total_pos_qp, use_bank_qp,
+                    *[spec[1].getvalue() for spec in section_specs]
+                )
+                st.session_state.job_id = job_runner.submit("question_paper", fingerprint, run_question_paper_job)
+
+            if st.session_state.job_id:
+                follow_job("Generating question paper...", "Question paper generation failed")
+            show_run_profile()
 
             if st.session_state.preview_rows:
                 st.subheader("📋 Question Paper Preview")
-                df_qp = pd.DataFrame(st.session_state.preview_rows)
-                st.dataframe(df_qp, use_container_width=True)
+                st.dataframe(st.session_state.preview_rows, use_container_width=True)
 
                 st.success("Question paper preview ready. Download below 👇")
 
-                if st.session_state.generated_docx_path:
-                    with open(st.session_state.generated_docx_path, "rb") as f:
-                        st.download_button(
-                            label="⬇ Download Question Paper DOCX",
-                            data=f,
-                            file_name=os.path.basename(st.session_state.generated_docx_path),
-                            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                        )
+                show_download_buttons("Question Paper")
             else:
-                st.info("Upload all 5 unit files and click **Generate Question Paper Preview**.")
\ No newline at end of file
+                st.info("Upload all 5 unit files and click **Generate Question Paper Preview**.")
+
+# Last, so the imports never compete with drawing the page.
+preload_generation_modules()
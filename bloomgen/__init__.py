@@ -0,0 +1 @@
+# BloomGen core: process-wide helpers shared by the Streamlit app.
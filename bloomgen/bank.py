@@ -0,0 +1,329 @@
+# Local question bank: every generated question is kept with its subject, the
+# hash of the syllabus chunks it came from, Bloom level, marks and CO, and the
+# generators draw from it before asking the LLM for the shortfall.
+#
+#   python -m bloomgen.bank export bank.csv [--subject "Operating Systems"]
+#   python -m bloomgen.bank import bank.csv
+#   python -m bloomgen.bank search "deadlock avoidance" [--subject ...] [--bloom Apply]
+#   python -m bloomgen.bank stats
+#
+# Import/export files are CSV or JSON Lines with the columns in BANK_FIELDS;
+# only subject and question are required on import. Rows without a bloom
+# column are labelled by the local classifier in one batch.
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+
+from bloomgen.cache import CACHE_DIR
+from bloomgen.dedup import MinHashIndex, filter_near_duplicates, minhash_signatures
+
+# =========================
+# Bank Settings
+# =========================
+QUESTION_BANK_ENABLED = os.getenv("BLOOMGEN_QUESTION_BANK", "1") != "0"
+# A question served within this window is not handed out again, so back-to-back
+# semesters do not repeat a paper.
+BANK_REUSE_SECONDS = int(os.getenv("BLOOMGEN_BANK_REUSE_DAYS", "150")) * 24 * 3600
+
+BANK_FIELDS = ["subject", "question", "bloom", "marks", "co", "source_hash", "use_count", "last_used"]
+
+TOPIC_TERMS = 12
+STOPWORDS = frozenset(
+    "about above after also among and are based been being between both but can each from have into its "
+    "more most such than that the their them then there these they this those through under unit using "
+    "various were what when where which while will with within".split()
+)
+
+
+def normalize_key(text):
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def topic_query(text):
+    # The most frequent content words of the source material, as an FTS5 OR query.
+    words = re.findall(r"[a-z][a-z0-9]{3,}", (text or "").lower())
+    terms = [w for w, _ in Counter(w for w in words if w not in STOPWORDS).most_common(TOPIC_TERMS)]
+    return " OR ".join(f'"{t}"' for t in terms)
+
+
+# =========================
+# SQLite Question Bank
+# =========================
+class QuestionBank:
+    def __init__(self, path, reuse_seconds=BANK_REUSE_SECONDS):
+        self.path = path
+        self.reuse_seconds = reuse_seconds
+        self._lock = threading.Lock()
+        # Per-subject MinHash indexes, loaded on the first insert for that subject.
+        self._indexes = {}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "id INTEGER PRIMARY KEY, subject TEXT NOT NULL, subject_key TEXT NOT NULL, "
+            "source_hash TEXT NOT NULL DEFAULT '', bloom TEXT NOT NULL, marks TEXT NOT NULL DEFAULT '', "
+            "co TEXT NOT NULL DEFAULT '', question TEXT NOT NULL, question_key TEXT NOT NULL, "
+            "created REAL NOT NULL, last_used REAL, use_count INTEGER NOT NULL DEFAULT 0, "
+            "UNIQUE(subject_key, question_key))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS questions_lookup ON questions(subject_key, source_hash, bloom)"
+        )
+        # External-content FTS index over the question text, kept in sync by triggers.
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts "
+            "USING fts5(question, content='questions', content_rowid='id')"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS questions_ai AFTER INSERT ON questions BEGIN "
+            "INSERT INTO questions_fts(rowid, question) VALUES (new.id, new.question); END"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS questions_ad AFTER DELETE ON questions BEGIN "
+            "INSERT INTO questions_fts(questions_fts, rowid, question) VALUES ('delete', old.id, old.question); END"
+        )
+
+    def _subject_index(self, subject_key):
+        index = self._indexes.get(subject_key)
+        if index is None:
+            existing = [q for (q,) in self._conn.execute(
+                "SELECT question FROM questions WHERE subject_key = ?", (subject_key,)
+            )]
+            index = MinHashIndex()
+            signatures, has_content = minhash_signatures(existing)
+            index.add(signatures[has_content])
+            self._indexes[subject_key] = index
+        return index
+
+    def _insert(self, records):
+        with self._lock:
+            # Rewordings of a banked question ("Describe X" next to "Explain X") are
+            # dropped along with exact duplicates, one vectorized pass per subject.
+            by_subject = {}
+            for record in records:
+                by_subject.setdefault(record[1], []).append(record)
+            records = []
+            for subject_key, group in by_subject.items():
+                keep = filter_near_duplicates([r[6] for r in group], self._subject_index(subject_key))
+                records += [group[i] for i in keep]
+
+            self._conn.execute("BEGIN")
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO questions(subject, subject_key, source_hash, bloom, marks, co, "
+                "question, question_key, created, last_used, use_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                records
+            )
+            self._conn.execute("COMMIT")
+        # rowcount counts only rows actually inserted, not ignored duplicates or FTS trigger writes.
+        return cursor.rowcount
+
+    def add(self, subject, pairs, source_hash="", marks="", co="", used=False):
+        # pairs are (question, bloom); a question already banked for the subject is skipped.
+        now = time.time()
+        rows = [
+            (subject, normalize_key(subject), source_hash, bloom, str(marks), co, q, normalize_key(q),
+             now, now if used else None, 1 if used else 0)
+            for q, bloom in pairs
+            if q and q.strip()
+        ]
+        return self._insert(rows)
+
+    def take(self, subject, bucket_counts, source_hash, marks="", topic=""):
+        # Claims up to n unused questions per Bloom bucket and marks them used.
+        # Questions generated from the same source chunks come first; imported
+        # questions with no source are then matched against the material by FTS.
+        now = time.time()
+        subject_key = normalize_key(subject)
+        available = "(q.last_used IS NULL OR q.last_used < ?)"
+        marks_filter = "AND q.marks IN (?, '')" if marks else ""
+        query = topic_query(topic)
+
+        taken = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for bloom, count in bucket_counts.items():
+                    if count <= 0:
+                        continue
+
+                    params = [subject_key, bloom, source_hash, now - self.reuse_seconds]
+                    if marks:
+                        params.append(str(marks))
+                    rows = self._conn.execute(
+                        f"SELECT q.id, q.question FROM questions q WHERE q.subject_key = ? AND q.bloom = ? "
+                        f"AND q.source_hash = ? AND {available} {marks_filter} "
+                        f"ORDER BY q.use_count, q.id LIMIT ?",
+                        (*params, count)
+                    ).fetchall()
+
+                    if len(rows) < count and query:
+                        params = [query, subject_key, bloom, now - self.reuse_seconds]
+                        if marks:
+                            params.append(str(marks))
+                        rows += self._conn.execute(
+                            f"SELECT q.id, q.question FROM questions_fts f JOIN questions q ON q.id = f.rowid "
+                            f"WHERE questions_fts MATCH ? AND q.subject_key = ? AND q.bloom = ? "
+                            f"AND q.source_hash = '' AND {available} {marks_filter} "
+                            f"ORDER BY bm25(questions_fts), q.use_count LIMIT ?",
+                            (*params, count - len(rows))
+                        ).fetchall()
+
+                    self._conn.executemany(
+                        "UPDATE questions SET last_used = ?, use_count = use_count + 1 WHERE id = ?",
+                        [(now, row_id) for row_id, _ in rows]
+                    )
+                    taken += [(q, bloom) for _, q in rows]
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return taken
+
+    def search(self, text, subject=None, bloom=None, limit=20):
+        query = topic_query(text)
+        if not query:
+            return []
+
+        sql = (
+            "SELECT q.subject, q.question, q.bloom, q.marks, q.co, q.source_hash, q.use_count, q.last_used "
+            "FROM questions_fts f JOIN questions q ON q.id = f.rowid WHERE questions_fts MATCH ?"
+        )
+        params = [query]
+        if subject:
+            sql += " AND q.subject_key = ?"
+            params.append(normalize_key(subject))
+        if bloom:
+            sql += " AND q.bloom = ?"
+            params.append(bloom)
+        sql += " ORDER BY bm25(questions_fts) LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(zip(BANK_FIELDS, row)) for row in rows]
+
+    def export_rows(self, subject=None):
+        sql = "SELECT subject, question, bloom, marks, co, source_hash, use_count, last_used FROM questions"
+        params = []
+        if subject:
+            sql += " WHERE subject_key = ?"
+            params.append(normalize_key(subject))
+        sql += " ORDER BY subject_key, id"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(zip(BANK_FIELDS, row)) for row in rows]
+
+    def import_rows(self, rows):
+        rows = [row for row in rows if row.get("subject") and (row.get("question") or "").strip()]
+        unlabelled = [row for row in rows if not row.get("bloom")]
+        if unlabelled:
+            # Imported lazily: bloomgen.classify reads its training files through this module.
+            from bloomgen.classify import get_bloom_classifier
+            predictions = get_bloom_classifier().predict(row["question"] for row in unlabelled)
+            for row, (level, _) in zip(unlabelled, predictions):
+                row["bloom"] = level
+
+        now = time.time()
+        records = []
+        for row in rows:
+            subject, question, bloom = row["subject"], row["question"], row["bloom"]
+            last_used = row.get("last_used")
+            records.append((
+                subject, normalize_key(subject), row.get("source_hash") or "", bloom,
+                str(row.get("marks") or ""), row.get("co") or "", question.strip(), normalize_key(question),
+                now, float(last_used) if last_used not in (None, "") else None, int(row.get("use_count") or 0)
+            ))
+
+        return self._insert(records)
+
+    def stats(self):
+        with self._lock:
+            count, subjects, served = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT subject_key), COALESCE(SUM(use_count), 0) FROM questions"
+            ).fetchone()
+        return {"questions": count, "subjects": subjects, "served": served}
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> QuestionBank:
+    global _bank
+    with _bank_lock:
+        if _bank is None:
+            _bank = QuestionBank(os.path.join(CACHE_DIR, "question_bank.sqlite3"))
+        return _bank
+
+
+# =========================
+# Bulk Import / Export
+# =========================
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            return [json.loads(line) for line in f if line.strip()]
+        return list(csv.DictReader(f))
+
+
+def write_rows(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            return
+        writer = csv.DictWriter(f, fieldnames=BANK_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bloomgen.bank", description="Manage the local question bank.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_cmd = commands.add_parser("export", help="write the bank to a CSV or JSONL file")
+    export_cmd.add_argument("path")
+    export_cmd.add_argument("--subject")
+
+    import_cmd = commands.add_parser("import", help="add questions from a CSV or JSONL file")
+    import_cmd.add_argument("path")
+
+    search_cmd = commands.add_parser("search", help="full-text search over banked questions")
+    search_cmd.add_argument("text")
+    search_cmd.add_argument("--subject")
+    search_cmd.add_argument("--bloom")
+    search_cmd.add_argument("--limit", type=int, default=20)
+
+    commands.add_parser("stats", help="show bank size")
+
+    args = parser.parse_args(argv)
+    bank = get_question_bank()
+
+    if args.command == "export":
+        rows = bank.export_rows(args.subject)
+        write_rows(args.path, rows)
+        print(f"Exported {len(rows)} questions to {args.path}")
+    elif args.command == "import":
+        rows = read_rows(args.path)
+        added = bank.import_rows(rows)
+        print(f"Imported {added} new questions ({len(rows) - added} skipped as duplicates or incomplete)")
+    elif args.command == "search":
+        for row in bank.search(args.text, args.subject, args.bloom, args.limit):
+            print(f"[{row['subject']} | {row['bloom']}] {row['question']}")
+    else:
+        print(json.dumps(bank.stats()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,470 @@
+# Offline benchmarks: BloomGen's own overhead, measured without the provider.
+# ChatGroq is swapped for bloomgen.fake_llm (fixed latency, deterministic
+# replies) and every cache lives in a throwaway directory, so runs are
+# repeatable and comparable between commits.
+#
+#   python -m bloomgen.bench run --output bench.json            # full suite
+#   python -m bloomgen.bench run --quick --latency 0.05         # smaller sizes
+#   python -m bloomgen.bench compare base.json bench.json --threshold 0.15
+#
+# Each case reports latency percentiles (ms) over --repeat timed iterations
+# after one warm-up, ops/s and units/s (pages, rows or questions). Generation
+# cases run twice: at zero latency (pure overhead: prompting, parsing, dedup,
+# retrieval, scheduling) and at --latency (end to end). "cold" cases see new
+# input every iteration; "warm" ones repeat it, so summaries come from cache.
+# app cases time app.py's script runs: a page's first render in a fresh
+# process, and a rerun once it is up.
+# compare exits 1 when a case's p50 grew by more than the threshold.
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import docx
+import numpy as np
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+# Only modules that never touch the caches are imported here; the rest are
+# imported by the cases, once scratch_cache_dir() has moved the caches away.
+from bloomgen.fake_llm import FAKE_TOPICS, install_fake_llm
+
+REPORT_VERSION = 1
+PERCENTILES = [50, 90, 95, 99]
+
+DOCUMENT_PAGES = [1, 10, 100, 500]
+DOCUMENT_PAGES_QUICK = [1, 10, 50]
+DOCX_ROWS = [10, 100, 1000, 5000]
+DOCX_ROWS_QUICK = [10, 100, 500]
+LINES_PER_PAGE = 40
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(BASE_DIR, "app.py")
+APP_PAGES = ["login", "home", "assignment", "question_paper"]
+APP_FIRST_RENDER_REPEAT = 3
+
+DOC_FIELDS = {
+    "department": "CSE", "semester": "VIII", "academic_year": "2025-26", "course_name": "Operating Systems",
+    "course_code": "CS801", "subject_teacher": "Bench", "duration": "2 Hours", "total_marks": "48"
+}
+
+
+# =========================
+# Scratch Cache
+# =========================
+@contextlib.contextmanager
+def scratch_cache_dir(prefix):
+    # Points BLOOMGEN_CACHE_DIR at a new directory and removes it afterwards, so a
+    # benchmark never reads from or writes to the real caches. bloomgen modules read
+    # the variable when first imported, so none of them may be imported before this.
+    if "bloomgen.cache" in sys.modules:
+        raise RuntimeError("bloomgen caches were already opened; call scratch_cache_dir() before importing them")
+
+    previous = os.environ.get("BLOOMGEN_CACHE_DIR")
+    path = tempfile.mkdtemp(prefix=prefix)
+    os.environ["BLOOMGEN_CACHE_DIR"] = path
+    try:
+        yield path
+    finally:
+        if previous is None:
+            os.environ.pop("BLOOMGEN_CACHE_DIR", None)
+        else:
+            os.environ["BLOOMGEN_CACHE_DIR"] = previous
+        # The cache databases are still open; that only blocks removal on Windows.
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# =========================
+# Synthetic Inputs
+# =========================
+def syllabus_text(salt, units=5, topics_per_unit=14):
+    # Different salts give different text (and so different cache keys) of the same size.
+    lines = []
+    for unit in range(units):
+        lines.append(f"Unit {unit + 1}: Module {salt}-{unit}")
+        for t in range(topics_per_unit):
+            topic = FAKE_TOPICS[(salt * 7 + unit * topics_per_unit + t) % len(FAKE_TOPICS)].replace("-", " ")
+            lines.append(
+                f"{topic} ({salt}.{unit}.{t}): definition, working principle, algorithm steps, "
+                f"advantages and limitations, comparison with related approaches and typical numerical problems."
+            )
+    return "\n".join(lines)
+
+
+def page_lines(page):
+    return [
+        f"Page {page + 1} line {i + 1}: {FAKE_TOPICS[(page + i) % len(FAKE_TOPICS)]} and its applications."
+        for i in range(LINES_PER_PAGE)
+    ]
+
+
+def synthetic_pdf(pages) -> bytes:
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    for page in range(pages):
+        text = pdf.beginText(40, 800)
+        text.setFont("Helvetica", 10)
+        for line in page_lines(page):
+            text.textLine(line)
+        pdf.drawText(text)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def synthetic_docx(pages) -> bytes:
+    doc = docx.Document()
+    for page in range(pages):
+        for line in page_lines(page):
+            doc.add_paragraph(line)
+        if page < pages - 1:
+            doc.add_page_break()
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def assignment_inputs(rows):
+    buckets = ["Understand", "Apply", "Analyze/Evaluate"]
+    questions = [f"Explain {FAKE_TOPICS[i % len(FAKE_TOPICS)]} with a suitable example ({i + 1})." for i in range(rows)]
+    return questions, [buckets[i % 3] for i in range(rows)]
+
+
+def question_paper_inputs(rows):
+    from bloomgen.generation import QUESTION_PAPER_SECTIONS, build_question_paper_rows
+
+    # Rows spread evenly over the five sections, built the way the app builds them.
+    per_section = {}
+    for i in range(rows):
+        section = QUESTION_PAPER_SECTIONS[i % len(QUESTION_PAPER_SECTIONS)][0]
+        per_section.setdefault(section, []).append(f"Discuss {FAKE_TOPICS[i % len(FAKE_TOPICS)]} in detail ({i + 1}).")
+    return build_question_paper_rows(per_section, 6, 12)
+
+
+# =========================
+# Measurement
+# =========================
+def measure(name, fn, repeat, units=1, unit_name="ops", warmup=1, model=None, self_timed=False, **params):
+    # fn(i) is called warmup + repeat times with a distinct i; only the last repeat are timed.
+    # A self_timed fn returns its own elapsed seconds instead.
+    timings = []
+    calls = 0
+    for i in range(warmup + repeat):
+        before = model.calls if model else 0
+        started = time.perf_counter()
+        reported = fn(i)
+        elapsed = reported if self_timed else time.perf_counter() - started
+        if i >= warmup:
+            timings.append(elapsed)
+            calls += (model.calls - before) if model else 0
+
+    seconds = np.array(timings)
+    result = {
+        "name": name,
+        "params": params,
+        "samples": len(timings),
+        "units": units,
+        "unit_name": unit_name,
+        **{f"p{p}_ms": round(float(np.percentile(seconds, p)) * 1000, 3) for p in PERCENTILES},
+        "mean_ms": round(float(seconds.mean()) * 1000, 3),
+        "min_ms": round(float(seconds.min()) * 1000, 3),
+        "max_ms": round(float(seconds.max()) * 1000, 3),
+        "ops_per_s": round(len(timings) / float(seconds.sum()), 3),
+        "units_per_s": round(units * len(timings) / float(seconds.sum()), 3)
+    }
+    if model:
+        result["llm_calls_per_op"] = round(calls / len(timings), 2)
+    print(f"  {name:<48} p50 {result['p50_ms']:>10.1f} ms  p95 {result['p95_ms']:>10.1f} ms  "
+          f"{result['units_per_s']:>10.1f} {unit_name}/s", flush=True)
+    return result
+
+
+# =========================
+# Benchmark Cases
+# =========================
+def bench_extraction(pages_list, repeat, work_dir):
+    from bloomgen.extract import extract_text
+
+    results = []
+    for kind, build in (("pdf", synthetic_pdf), ("docx", synthetic_docx)):
+        for pages in pages_list:
+            path = os.path.join(work_dir, f"bench_{pages}.{kind}")
+            with open(path, "wb") as f:
+                f.write(build(pages))
+
+            # page_range is part of the cache key but is clamped to the page count,
+            # so (0, pages + 1 + i) parses the whole file under a fresh key each time.
+            results.append(measure(
+                f"extract.{kind}.{pages}p.cold", lambda i: extract_text(path, page_range=(0, pages + 1 + i)),
+                repeat, pages, "pages", kind=kind, pages=pages
+            ))
+            results.append(measure(
+                f"extract.{kind}.{pages}p.cached", lambda i: extract_text(path),
+                repeat, pages, "pages", kind=kind, pages=pages
+            ))
+    return results
+
+
+def bench_render(rows_list, repeat):
+    from bloomgen.docx_render import generate_question_paper_docx, generate_university_docx
+
+    results = []
+    for rows in rows_list:
+        questions, labels = assignment_inputs(rows)
+        results.append(measure(
+            f"render.assignment_docx.{rows}rows",
+            lambda i: generate_university_docx(DOC_FIELDS, questions, labels, 6, 12, 3, 5, 7),
+            repeat, rows, "rows", rows=rows
+        ))
+
+        paper_rows = question_paper_inputs(rows)
+        results.append(measure(
+            f"render.question_paper_docx.{rows}rows",
+            lambda i: generate_question_paper_docx(DOC_FIELDS, paper_rows),
+            repeat, rows, "rows", rows=rows
+        ))
+    return results
+
+
+def bench_generation(latencies, repeat, question_count):
+    from bloomgen.generation import QUESTION_PAPER_SECTIONS, generate_questions, generate_section_questions
+
+    results = []
+    _, _, section_count, marks, style, bloom_hint, _ = QUESTION_PAPER_SECTIONS[2]
+    cases = [
+        ("generate_questions.structured", True),
+        ("generate_questions.batched", False),
+        ("generate_section_questions", None)
+    ]
+
+    salt = 0
+    for latency in latencies:
+        model = install_fake_llm(latency_seconds=latency)
+        label = "overhead" if latency == 0 else f"latency{int(latency * 1000)}ms"
+
+        for name, structured in cases:
+            for cache in ("cold", "warm"):
+                # Cold iterations each get a syllabus no earlier iteration has seen.
+                base = salt
+                salt += repeat + 1
+
+                def run_case(i, base=base, cold=cache == "cold", structured=structured):
+                    text_salt = base + i if cold else base
+                    if structured is None:
+                        return generate_section_questions(
+                            "Operating Systems", syllabus_text(text_salt, units=1), section_count, marks, style,
+                            bloom_hint, use_bank=False
+                        )
+                    return generate_questions(
+                        "Operating Systems", syllabus_text(text_salt), question_count, 30, 30, 40,
+                        structured=structured, use_bank=False
+                    )
+
+                units = section_count if structured is None else question_count
+                results.append(measure(
+                    f"{name}.{cache}.{label}", run_case, repeat, units, "questions", model=model,
+                    latency_s=latency, cache=cache
+                ))
+    return results
+
+
+# A fresh interpreter per sample, so the first render pays for every import the page makes.
+FIRST_RENDER_SCRIPT = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+if sys.argv[2] != "login":
+    at.session_state.logged_in = True
+    at.session_state.role = "Admin"
+    at.session_state.mode = None if sys.argv[2] == "home" else sys.argv[2]
+started = time.perf_counter()
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - started)
+"""
+
+
+def app_first_render(page):
+    completed = subprocess.run(
+        [sys.executable, "-c", FIRST_RENDER_SCRIPT, APP_PATH, page],
+        capture_output=True, text=True, check=True, cwd=BASE_DIR
+    )
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def bench_app(repeat):
+    # Script runs of app.py: the first render of each page in a new process, and
+    # a rerun (what every widget interaction costs) once the page is up.
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import AppTest, local_script_runner
+
+    # AppTest compiles the script anew on every run; the server compiles it once
+    # and reuses the bytecode, so reruns here share one cache the same way.
+    shared_cache = ScriptCache()
+    original = local_script_runner.ScriptCache
+    # Setting session state from outside a script run logs a harmless warning per call.
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+        lambda record: "missing ScriptRunContext" not in record.getMessage()
+    )
+    local_script_runner.ScriptCache = lambda: shared_cache
+    results = []
+    try:
+        for page in APP_PAGES:
+            results.append(measure(
+                f"app.{page}.first_render", lambda i, page=page: app_first_render(page),
+                min(repeat, APP_FIRST_RENDER_REPEAT), unit_name="renders", warmup=0, self_timed=True, page=page
+            ))
+
+            at = AppTest.from_file(APP_PATH, default_timeout=300)
+            if page != "login":
+                at.session_state.logged_in = True
+                at.session_state.role = "Admin"
+                at.session_state.mode = None if page == "home" else page
+            at.run()
+            # Reruns are timed once app.py's background module preload is done;
+            # the first_render cases already cover start-up.
+            for thread in threading.enumerate():
+                if thread.name == "bloomgen-preload":
+                    thread.join()
+            results.append(measure(f"app.{page}.rerun", lambda i, at=at: at.run(), repeat, unit_name="reruns", page=page))
+            if at.exception:
+                raise RuntimeError(f"app.py failed on the {page} page: {at.exception}")
+    finally:
+        local_script_runner.ScriptCache = original
+    return results
+
+
+# =========================
+# Reports
+# =========================
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(args):
+    from bloomgen.llm import configure_scheduler
+
+    # Unlimited rate: the suite measures BloomGen, not the provider's quota.
+    configure_scheduler(requests_per_minute=0, tokens_per_minute=0, max_concurrency=args.llm_concurrency)
+    pages = DOCUMENT_PAGES_QUICK if args.quick else DOCUMENT_PAGES
+    rows = DOCX_ROWS_QUICK if args.quick else DOCX_ROWS
+
+    started = time.time()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bloomgen-bench-docs-") as work_dir:
+        if "extract" in args.only:
+            print("extract_text")
+            results += bench_extraction(pages, args.repeat, work_dir)
+    if "render" in args.only:
+        print("DOCX rendering")
+        results += bench_render(rows, args.repeat)
+    if "generate" in args.only:
+        print("generation")
+        results += bench_generation(sorted({0.0, args.latency}), args.repeat, args.questions)
+    if "app" in args.only:
+        print("Streamlit script runs")
+        results += bench_app(args.repeat)
+
+    return {
+        "version": REPORT_VERSION,
+        "commit": git_commit(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "seconds": round(time.time() - started, 1),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "settings": {
+            "quick": args.quick, "repeat": args.repeat, "latency_s": args.latency,
+            "questions": args.questions, "llm_concurrency": args.llm_concurrency
+        },
+        "results": results
+    }
+
+
+def compare_reports(baseline, current, threshold):
+    # Matches cases by name; returns (rows, regressions) where each row is
+    # (name, baseline p50, current p50, relative change).
+    before = {r["name"]: r for r in baseline["results"]}
+    rows = []
+    regressions = []
+    for result in current["results"]:
+        base = before.get(result["name"])
+        if not base or not base["p50_ms"]:
+            continue
+        change = result["p50_ms"] / base["p50_ms"] - 1
+        rows.append((result["name"], base["p50_ms"], result["p50_ms"], change))
+        if change > threshold:
+            regressions.append(result["name"])
+    return rows, regressions
+
+
+def load_report(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# =========================
+# Command Line
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bloomgen.bench", description="Offline BloomGen benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = commands.add_parser("run", help="run the suite against the fake LLM and write a JSON report")
+    run_cmd.add_argument("--output", help="report path (default: bench_<commit>.json)")
+    run_cmd.add_argument("--quick", action="store_true", help="smaller documents and row counts")
+    run_cmd.add_argument("--repeat", type=int, default=5, help="timed iterations per case")
+    run_cmd.add_argument("--latency", type=float, default=0.2, help="fake LLM latency per call in seconds")
+    run_cmd.add_argument("--questions", type=int, default=10, help="questions per generate_questions call")
+    run_cmd.add_argument("--llm-concurrency", type=int, default=4)
+    run_cmd.add_argument(
+        "--only", nargs="+", choices=["extract", "render", "generate", "app"],
+        default=["extract", "render", "generate", "app"]
+    )
+
+    compare_cmd = commands.add_parser("compare", help="compare two reports case by case")
+    compare_cmd.add_argument("baseline")
+    compare_cmd.add_argument("current")
+    compare_cmd.add_argument("--threshold", type=float, default=0.15, help="allowed p50 growth, 0.15 = 15%%")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        with scratch_cache_dir("bloomgen-bench-"):
+            report = run_suite(args)
+        output = args.output or f"bench_{report['commit'] or 'local'}.json"
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"{len(report['results'])} cases in {report['seconds']}s -> {output}")
+        return 0
+
+    baseline, current = load_report(args.baseline), load_report(args.current)
+    rows, regressions = compare_reports(baseline, current, args.threshold)
+    print(f"{baseline.get('commit')} -> {current.get('commit')}")
+    for name, before, after, change in rows:
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"  {name:<48} {before:>10.1f} -> {after:>10.1f} ms  {change:+7.1%}{flag}")
+    print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# =========================
+# Cache Location
+# =========================
+CACHE_DIR = os.getenv("BLOOMGEN_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "bloomgen"))
+
+
+def content_hash(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, bytes) else str(part).encode("utf-8")
+        # Length prefix keeps ("ab", "c") and ("a", "bc") from colliding.
+        h.update(str(len(data)).encode("ascii") + b":")
+        h.update(data)
+    return h.hexdigest()
+
+
+# =========================
+# SQLite LRU Cache
+# =========================
+class DiskLRUCache:
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, max_entries=20000, max_age_seconds=30 * 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _bump(self, name):
+        self._conn.execute(
+            "INSERT INTO counters(name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and now - row[1] > self.max_age_seconds:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+
+            if row is None:
+                self._bump("misses")
+                return None
+
+            self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+            self._bump("hits")
+            return row[0]
+
+    def put(self, key, value):
+        now = time.time()
+        size = len(value) if isinstance(value, bytes) else len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries(key, value, size, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM entries WHERE created < ?", (now - self.max_age_seconds,))
+
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # Drop least recently used entries until both limits hold again.
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_used ASC"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": count,
+            "bytes": total
+        }
+
+
+# =========================
+# In-Memory LRU Tier
+# =========================
+class MemoryLRUCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value: str):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.encode("utf-8"))
+
+            self._items[key] = value
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted.encode("utf-8"))
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self._bytes}
+
+
+# =========================
+# Memory + Disk Cache
+# =========================
+class TieredCache:
+    def __init__(self, memory: MemoryLRUCache, disk: DiskLRUCache):
+        self.memory = memory
+        self.disk = disk
+        self._lock = threading.Lock()
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._parse_count = 0
+        self._parse_seconds = 0.0
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+
+        value = self.disk.get(key)
+        if value is not None:
+            self.memory.put(key, value)
+            self._count("disk_hits")
+            return value
+
+        self._count("misses")
+        return None
+
+    def put(self, key, value: str):
+        self.memory.put(key, value)
+        self.disk.put(key, value)
+
+    def record_parse(self, seconds: float):
+        with self._lock:
+            self._parse_count += 1
+            self._parse_seconds += seconds
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            parse_count = self._parse_count
+            parse_seconds = self._parse_seconds
+
+        lookups = sum(counts.values())
+        hits = counts["memory_hits"] + counts["disk_hits"]
+        return {
+            **counts,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "parses": parse_count,
+            "parse_seconds_total": parse_seconds,
+            "parse_seconds_avg": parse_seconds / parse_count if parse_count else 0.0,
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats()
+        }
+
+
+# =========================
+# Artifact Store
+# =========================
+class ArtifactStore:
+    # Content-addressed: an artifact's id is the sha256 of its bytes, so storing
+    # the same document twice costs one slot. TTL and total-size eviction come
+    # from the underlying DiskLRUCache.
+    def __init__(self, cache: DiskLRUCache):
+        self.cache = cache
+
+    def put(self, data: bytes) -> str:
+        artifact_id = hashlib.sha256(data).hexdigest()
+        self.cache.put(artifact_id, data)
+        return artifact_id
+
+    def get(self, artifact_id):
+        return self.cache.get(artifact_id)
+
+    def stats(self):
+        return self.cache.stats()
+
+
+# =========================
+# Shared Instances
+# =========================
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def _shared(name, factory):
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = factory()
+        return _instances[name]
+
+
+def get_summary_cache() -> DiskLRUCache:
+    return _shared(
+        "summaries",
+        lambda: DiskLRUCache(
+            os.path.join(CACHE_DIR, "summaries.sqlite3"),
+            max_bytes=int(os.getenv("BLOOMGEN_SUMMARY_CACHE_MB", "64")) * 1024 * 1024,
+            max_age_seconds=int(os.getenv("BLOOMGEN_SUMMARY_CACHE_DAYS", "30")) * 24 * 3600
+        )
+    )
+
+
+def get_extraction_cache() -> TieredCache:
+    return _shared(
+        "extraction",
+        lambda: TieredCache(
+            MemoryLRUCache(max_bytes=int(os.getenv("BLOOMGEN_EXTRACT_MEMORY_MB", "32")) * 1024 * 1024),
+            DiskLRUCache(
+                os.path.join(CACHE_DIR, "extracted_text.sqlite3"),
+                max_bytes=int(os.getenv("BLOOMGEN_EXTRACT_CACHE_MB", "256")) * 1024 * 1024
+            )
+        )
+    )
+
+
+def get_artifact_store() -> ArtifactStore:
+    return _shared(
+        "artifacts",
+        lambda: ArtifactStore(
+            DiskLRUCache(
+                os.path.join(CACHE_DIR, "artifacts.sqlite3"),
+                max_bytes=int(os.getenv("BLOOMGEN_ARTIFACT_STORE_MB", "256")) * 1024 * 1024,
+                max_age_seconds=int(os.getenv("BLOOMGEN_ARTIFACT_TTL_HOURS", "24")) * 3600
+            )
+        )
+    )
@@ -0,0 +1,310 @@
+# Local Bloom-level classifier: checks the bucket a question was generated
+# under without another LLM call.
+#
+#   python -m bloomgen.classify train bank.csv [more.csv ...] [--model bloom_model.npz] [--holdout 0.2]
+#   python -m bloomgen.classify eval test.csv [--model bloom_model.npz]
+#   python -m bloomgen.classify label "Compare paging and segmentation."
+#
+# Features are hashed TF-IDF unigrams and bigrams plus a few Bloom verb-lexicon
+# cues, scored by a multinomial logistic regression written in NumPy. Training
+# files are CSV or JSON Lines with question and bloom columns, so a question
+# bank export can be used directly. Without a trained model file the bundled
+# seed set in assets/bloom_seed.csv is used, which takes well under a second.
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from bloomgen.bank import read_rows
+from bloomgen.cache import CACHE_DIR
+
+# =========================
+# Classifier Settings
+# =========================
+BLOOM_LEVELS = ["Understand", "Apply", "Analyze/Evaluate"]
+BLOOM_MODEL_PATH = os.getenv("BLOOMGEN_BLOOM_MODEL", os.path.join(CACHE_DIR, "bloom_model.npz"))
+BLOOM_SEED_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "bloom_seed.csv")
+# A label is only reported as wrong when the classifier is at least this sure.
+BLOOM_MISMATCH_CONFIDENCE = float(os.getenv("BLOOMGEN_BLOOM_MISMATCH_CONFIDENCE", "0.8"))
+
+HASH_FEATURES = 2 ** 14
+TRAIN_EPOCHS = 300
+TRAIN_LEARNING_RATE = 0.5
+TRAIN_L2 = 1e-3
+
+# Remember/Understand, Apply and Analyze/Evaluate/Create verbs, collapsed onto the three buckets.
+VERB_LEXICON = {
+    "Understand": (
+        "define list state name recall identify what explain describe illustrate summarize summarise outline "
+        "classify discuss interpret give enumerate mention recognize recognise indicate note overview meant"
+    ),
+    "Apply": (
+        "apply solve demonstrate implement compute calculate use construct show perform find determine execute "
+        "simulate trace convert derive program code modify prepare draw encode decode normalize normalise "
+        "sketch develop build"
+    ),
+    "Analyze/Evaluate": (
+        "analyze analyse compare contrast differentiate distinguish examine evaluate justify assess critique "
+        "criticize criticise critically defend argue recommend judge prioritize design propose formulate "
+        "investigate infer deduce why which appraise validate decide"
+    )
+}
+VERB_LEVELS = {verb: level for level, verbs in VERB_LEXICON.items() for verb in verbs.split()}
+# Per level: the first lexicon verb in the question, and how many lexicon verbs it uses.
+LEXICON_FEATURES = 2 * len(BLOOM_LEVELS)
+LEXICON_PRIOR = (3.0, 1.0)
+
+
+def question_tokens(text):
+    return re.findall(r"[a-z][a-z0-9'-]*", (text or "").lower())
+
+
+def question_vectors(texts, idf):
+    # CSR rows: L2-normalised TF-IDF over hashed unigrams/bigrams, then the dense
+    # lexicon block at HASH_FEATURES + k. Every row carries the lexicon block, so
+    # no row is empty and per-row sums can use np.add.reduceat.
+    indptr = [0]
+    indices = []
+    data = []
+    lexicon_slots = np.arange(HASH_FEATURES, HASH_FEATURES + LEXICON_FEATURES)
+
+    for text in texts:
+        tokens = question_tokens(text)
+        terms = set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+        hashed = np.unique(np.fromiter(
+            (zlib.crc32(t.encode("utf-8")) % HASH_FEATURES for t in terms), dtype=np.int64, count=len(terms)
+        ))
+        weights = idf[hashed]
+        norm = np.sqrt((weights * weights).sum())
+        if norm:
+            weights = weights / norm
+
+        lexicon = np.zeros(LEXICON_FEATURES)
+        levels = [VERB_LEVELS[t] for t in tokens if t in VERB_LEVELS]
+        if levels:
+            lexicon[2 * BLOOM_LEVELS.index(levels[0])] = 1.0
+            for level in levels:
+                lexicon[2 * BLOOM_LEVELS.index(level) + 1] += 1.0 / 3
+            np.minimum(lexicon, 1.0, out=lexicon)
+
+        indices += [hashed, lexicon_slots]
+        data += [weights, lexicon]
+        indptr.append(indptr[-1] + len(hashed) + LEXICON_FEATURES)
+
+    return np.asarray(indptr), np.concatenate(indices), np.concatenate(data)
+
+
+# =========================
+# Linear Model
+# =========================
+class BloomClassifier:
+    def __init__(self, idf, weights, bias):
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def lexicon_prior(cls):
+        # Before any training, only the lexicon block votes.
+        weights = np.zeros((HASH_FEATURES + LEXICON_FEATURES, len(BLOOM_LEVELS)))
+        for k in range(len(BLOOM_LEVELS)):
+            weights[HASH_FEATURES + 2 * k, k] = LEXICON_PRIOR[0]
+            weights[HASH_FEATURES + 2 * k + 1, k] = LEXICON_PRIOR[1]
+        return cls(np.ones(HASH_FEATURES), weights, np.zeros(len(BLOOM_LEVELS)))
+
+    @classmethod
+    def train(cls, texts, labels, epochs=TRAIN_EPOCHS, learning_rate=TRAIN_LEARNING_RATE, l2=TRAIN_L2):
+        model = cls.lexicon_prior()
+        targets = np.zeros((len(texts), len(BLOOM_LEVELS)))
+        targets[np.arange(len(texts)), [BLOOM_LEVELS.index(label) for label in labels]] = 1.0
+
+        # Smoothed IDF over the hashed vocabulary of the training questions.
+        _, unit_indices, _ = question_vectors(texts, np.ones(HASH_FEATURES))
+        df = np.bincount(unit_indices[unit_indices < HASH_FEATURES], minlength=HASH_FEATURES)
+        model.idf = np.log((1 + len(texts)) / (1 + df)) + 1.0
+
+        indptr, indices, data = question_vectors(texts, model.idf)
+        row_ids = np.repeat(np.arange(len(texts)), np.diff(indptr))
+
+        # Full-batch gradient descent with Adam; the gradient X^T (P - Y) is one bincount per level.
+        moments = [np.zeros_like(model.weights), np.zeros_like(model.weights)]
+        bias_moments = [np.zeros_like(model.bias), np.zeros_like(model.bias)]
+        for step in range(1, epochs + 1):
+            residual = (model.proba_from_vectors(indptr, indices, data) - targets) / len(texts)
+            grad = np.stack([
+                np.bincount(indices, weights=data * residual[row_ids, k], minlength=len(model.weights))
+                for k in range(len(BLOOM_LEVELS))
+            ], axis=1) + l2 * model.weights
+            for params, gradient, (m, v) in (
+                (model.weights, grad, moments),
+                (model.bias, residual.sum(axis=0), bias_moments)
+            ):
+                m *= 0.9
+                m += 0.1 * gradient
+                v *= 0.999
+                v += 0.001 * gradient * gradient
+                params -= learning_rate * (m / (1 - 0.9 ** step)) / (np.sqrt(v / (1 - 0.999 ** step)) + 1e-8)
+        return model
+
+    def proba_from_vectors(self, indptr, indices, data):
+        scores = np.add.reduceat(self.weights[indices] * data[:, None], indptr[:-1], axis=0) + self.bias
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, texts):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, len(BLOOM_LEVELS)))
+        return self.proba_from_vectors(*question_vectors(texts, self.idf))
+
+    def predict(self, texts):
+        # [(level, confidence), ...] in input order.
+        proba = self.predict_proba(texts)
+        best = proba.argmax(axis=1)
+        return [(BLOOM_LEVELS[k], float(p)) for k, p in zip(best, proba[np.arange(len(best)), best])]
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez_compressed(f, idf=self.idf, weights=self.weights, bias=self.bias, levels=np.array(BLOOM_LEVELS))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as saved:
+            if list(saved["levels"]) != BLOOM_LEVELS or saved["weights"].shape[0] != HASH_FEATURES + LEXICON_FEATURES:
+                raise ValueError(f"{path} was trained for a different feature layout")
+            return cls(saved["idf"], saved["weights"], saved["bias"])
+
+
+def labelled_rows(rows):
+    pairs = [(row.get("question") or "", row.get("bloom") or "") for row in rows]
+    return [(q, label) for q, label in pairs if q.strip() and label in BLOOM_LEVELS]
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_bloom_classifier() -> BloomClassifier:
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            if os.path.exists(BLOOM_MODEL_PATH):
+                _classifier = BloomClassifier.load(BLOOM_MODEL_PATH)
+            else:
+                texts, labels = zip(*labelled_rows(read_rows(BLOOM_SEED_PATH)))
+                _classifier = BloomClassifier.train(texts, labels)
+        return _classifier
+
+
+# =========================
+# Label Checks
+# =========================
+def bloom_mismatches(rows, min_confidence=BLOOM_MISMATCH_CONFIDENCE):
+    # rows are preview rows; one batch call covers the whole document.
+    if not rows:
+        return []
+    predictions = get_bloom_classifier().predict(row["Question Statement"] for row in rows)
+    return [
+        {
+            "question_no": row["Question No."],
+            "label": row["Bloom’s Level"],
+            "predicted": predicted,
+            "confidence": confidence
+        }
+        for row, (predicted, confidence) in zip(rows, predictions)
+        if predicted != row["Bloom’s Level"] and confidence >= min_confidence
+    ]
+
+
+def mismatch_warning(mismatches):
+    if not mismatches:
+        return None
+    details = ", ".join(
+        f"{m['question_no']} reads as {m['predicted']} ({m['confidence']:.0%}), labelled {m['label']}"
+        for m in mismatches
+    )
+    return f"The Bloom classifier disagrees with {len(mismatches)} label(s): {details}."
+
+
+def relabel_pairs(pairs, min_confidence=BLOOM_MISMATCH_CONFIDENCE):
+    # (question, bloom) pairs with each confident disagreement replaced by the predicted level.
+    predictions = get_bloom_classifier().predict(q for q, _ in pairs)
+    return [
+        (q, predicted if predicted != bloom and confidence >= min_confidence else bloom)
+        for (q, bloom), (predicted, confidence) in zip(pairs, predictions)
+    ]
+
+
+# =========================
+# Offline Training / Evaluation
+# =========================
+def evaluate(model, pairs):
+    texts, labels = zip(*pairs)
+    start = time.perf_counter()
+    predicted = [level for level, _ in model.predict(texts)]
+    seconds = time.perf_counter() - start
+
+    confusion = np.zeros((len(BLOOM_LEVELS), len(BLOOM_LEVELS)), dtype=int)
+    for label, guess in zip(labels, predicted):
+        confusion[BLOOM_LEVELS.index(label), BLOOM_LEVELS.index(guess)] += 1
+
+    print(f"accuracy {np.trace(confusion) / len(labels):.3f} on {len(labels)} questions "
+          f"({len(labels) / max(seconds, 1e-9):,.0f} questions/s)")
+    for k, level in enumerate(BLOOM_LEVELS):
+        precision = confusion[k, k] / max(confusion[:, k].sum(), 1)
+        recall = confusion[k, k] / max(confusion[k].sum(), 1)
+        print(f"  {level:<17} precision {precision:.3f}  recall {recall:.3f}  confusion {confusion[k].tolist()}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bloomgen.classify", description="Local Bloom-level classifier.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train_cmd = commands.add_parser("train", help="train on CSV/JSONL files with question and bloom columns")
+    train_cmd.add_argument("paths", nargs="*", default=[BLOOM_SEED_PATH])
+    train_cmd.add_argument("--model", default=BLOOM_MODEL_PATH)
+    train_cmd.add_argument("--holdout", type=float, default=0.0, help="fraction held out and evaluated")
+    train_cmd.add_argument("--seed", type=int, default=0)
+
+    eval_cmd = commands.add_parser("eval", help="report accuracy and throughput on a labelled file")
+    eval_cmd.add_argument("path")
+    eval_cmd.add_argument("--model", default=BLOOM_MODEL_PATH)
+
+    label_cmd = commands.add_parser("label", help="classify questions given on the command line")
+    label_cmd.add_argument("questions", nargs="+")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        pairs = labelled_rows(row for path in args.paths for row in read_rows(path))
+        if not pairs:
+            parser.error("no rows with a question and a known bloom level")
+        order = np.random.default_rng(args.seed).permutation(len(pairs))
+        held = int(len(pairs) * args.holdout)
+        train_pairs = [pairs[i] for i in order[held:]]
+
+        start = time.perf_counter()
+        model = BloomClassifier.train(*zip(*train_pairs))
+        print(f"trained on {len(train_pairs)} questions in {time.perf_counter() - start:.2f}s")
+        if held:
+            evaluate(model, [pairs[i] for i in order[:held]])
+        model.save(args.model)
+        print(f"saved {args.model}")
+    elif args.command == "eval":
+        model = BloomClassifier.load(args.model) if os.path.exists(args.model) else get_bloom_classifier()
+        evaluate(model, labelled_rows(read_rows(args.path)))
+    else:
+        for question, (level, confidence) in zip(args.questions, get_bloom_classifier().predict(args.questions)):
+            print(f"{level} ({confidence:.0%})  {question}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
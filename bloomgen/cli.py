@@ -0,0 +1,332 @@
+# Headless batch generation: one manifest row per course, DOCX files plus a
+# summary report out. Imports nothing from Streamlit.
+#
+#   python -m bloomgen.cli courses.csv --output-dir papers/ --jobs 8 --llm-concurrency 6 --pdf
+#
+# Manifest (CSV columns, or YAML list of mappings / {"courses": [...]}):
+#   id                    unique course key, used for output names and resume state
+#   mode                  question_paper (default) or assignment
+#   question_paper:       course_name, course_code, subject_teacher, unit1..unit5
+#   assignment:           subject, syllabus, question_count, pct_understand, pct_apply,
+#                         pct_analyze_eval, marks_understand, marks_apply, marks_analyze_eval
+#   optional:             department, semester, academic_year, duration, total_marks,
+#                         year_div, assignment_no, teacher_name, max_marks, total_cos,
+#                         total_pos, subject_incharge, academic_coordinator, hod_name
+# File paths are relative to the manifest. Re-running with the same output dir
+# skips courses already recorded as done in batch_state.json.
+import argparse
+import csv
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import yaml
+from dotenv import load_dotenv
+
+# Load .env before importing bloomgen, which reads its BLOOMGEN_* settings at import.
+load_dotenv()
+
+from bloomgen import trace  # noqa: E402
+from bloomgen.docx_render import generate_question_paper_docx, generate_university_docx  # noqa: E402
+from bloomgen.extract import extract_text  # noqa: E402
+from bloomgen.generation import (  # noqa: E402
+    assignment_row,
+    build_question_paper_rows,
+    generate_paper_sections,
+    generate_questions,
+    normalize_bloom_percentages,
+    question_paper_section_specs
+)
+from bloomgen.llm import LLM_MAX_CONCURRENCY, configure_scheduler  # noqa: E402
+from bloomgen.pdf_render import generate_assignment_pdf, generate_question_paper_pdf  # noqa: E402
+
+STATE_FILE = "batch_state.json"
+REPORT_FILE = "batch_report.csv"
+REPORT_FIELDS = ["id", "mode", "status", "questions", "seconds", "output", "error"]
+
+DEFAULTS = {
+    "mode": "question_paper",
+    "department": "CSE",
+    "semester": "VIII",
+    "academic_year": "2025-26",
+    "duration": "2 Hours",
+    "total_marks": "48",
+    "year_div": "B.TECH",
+    "assignment_no": "03",
+    "max_marks": "60",
+    "question_count": 5,
+    "pct_understand": 30,
+    "pct_apply": 30,
+    "pct_analyze_eval": 40,
+    "marks_understand": 3,
+    "marks_apply": 5,
+    "marks_analyze_eval": 7,
+    "total_cos": 6,
+    "total_pos": 12
+}
+
+
+class ManifestError(ValueError):
+    pass
+
+
+# =========================
+# Manifest Loading
+# =========================
+def load_manifest(path):
+    if path.lower().endswith((".yaml", ".yml")):
+        with open(path, encoding="utf-8") as f:
+            data = yaml.safe_load(f) or []
+        if isinstance(data, dict):
+            data = data.get("courses", [])
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            data = list(csv.DictReader(f))
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    courses = []
+    seen = set()
+    for index, raw in enumerate(data, start=1):
+        course = dict(DEFAULTS)
+        course.update({k: v for k, v in raw.items() if v not in (None, "")})
+
+        course_id = str(course.get("id") or course.get("course_code") or "").strip()
+        if not course_id:
+            raise ManifestError(f"Course {index} has neither an id nor a course_code")
+        if course_id in seen:
+            raise ManifestError(f"Duplicate course id {course_id!r}")
+        seen.add(course_id)
+        course["id"] = course_id
+
+        if course["mode"] == "question_paper":
+            file_fields = [f"unit{i}" for i in range(1, 6)]
+        elif course["mode"] == "assignment":
+            file_fields = ["syllabus"]
+        else:
+            raise ManifestError(f"Course {course_id!r} has unknown mode {course['mode']!r}")
+
+        for field in file_fields:
+            if not course.get(field):
+                raise ManifestError(f"Course {course_id!r} is missing {field}")
+            course[field] = os.path.join(base_dir, course[field])
+
+        courses.append(course)
+
+    return courses
+
+
+def safe_filename(text):
+    cleaned = "".join(c for c in text if c.isalnum() or c in (" ", "_", "-")).strip()
+    return cleaned.replace(" ", "_")[:60] or "course"
+
+
+def write_document(path, data):
+    # Write-then-rename, so a half-written DOCX never counts as a finished course.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+# =========================
+# Per-Course Generation
+# =========================
+def run_question_paper(course, output_dir, pdf=False):
+    specs = question_paper_section_specs([course[f"unit{i}"] for i in range(1, 6)])
+    section_results, section_errors = generate_paper_sections(course.get("course_name", ""), specs)
+    if section_errors:
+        raise RuntimeError("; ".join(
+            f"Section {name}: {error}" for name, error in sorted(section_errors.items())
+        ))
+
+    rows = build_question_paper_rows(section_results, int(course["total_cos"]), int(course["total_pos"]))
+
+    today = datetime.date.today()
+    qp_data = {
+        "department": course["department"],
+        "semester": course["semester"],
+        "academic_year": course["academic_year"],
+        "course_name": course.get("course_name", ""),
+        "course_code": course.get("course_code", ""),
+        "subject_teacher": course.get("subject_teacher", ""),
+        "duration": course["duration"],
+        "total_marks": course["total_marks"],
+        "date": today,
+        "exam_date": today,
+        "subject_incharge": course.get("subject_incharge", ""),
+        "academic_coordinator": course.get("academic_coordinator", ""),
+        "hod_name": course.get("hod_name", "")
+    }
+
+    output_path = os.path.join(output_dir, f"{safe_filename(course['id'])}_Question_Paper.docx")
+    write_document(output_path, generate_question_paper_docx(qp_data, rows))
+    if pdf:
+        write_document(output_path[:-len(".docx")] + ".pdf", generate_question_paper_pdf(qp_data, rows))
+    return len(rows), output_path
+
+
+def run_assignment(course, output_dir, pdf=False):
+    question_count = int(course["question_count"])
+    pct_u, pct_a, pct_ae = normalize_bloom_percentages(
+        int(course["pct_understand"]), int(course["pct_apply"]), int(course["pct_analyze_eval"])
+    )
+    row_settings = (
+        int(course["total_cos"]),
+        int(course["total_pos"]),
+        int(course["marks_understand"]),
+        int(course["marks_apply"]),
+        int(course["marks_analyze_eval"])
+    )
+
+    subject = course.get("subject") or course.get("course_name", "")
+    pairs = generate_questions(
+        subject, extract_text(course["syllabus"]), question_count, pct_u, pct_a, pct_ae
+    )
+    questions_list = [q for (q, b) in pairs][:question_count]
+    bloom_labels = [b for (q, b) in pairs][:question_count]
+
+    today = datetime.date.today()
+    data = {
+        "{{DEPARTMENT}}": course["department"],
+        "{{SEMESTER}}": course["semester"],
+        "{{ACADEMIC_YEAR}}": course["academic_year"],
+        "{{YEAR_DIV}}": course["year_div"],
+        "{{MAX_MARKS}}": course["max_marks"],
+        "{{SUBJECT}}": subject,
+        "{{ASSIGNMENT_NO}}": course["assignment_no"],
+        "{{TEACHER_NAME}}": course.get("teacher_name", ""),
+        "{{DATE}}": today,
+        "{{SUBMISSION_DATE}}": today,
+        "{{SUBJECT_INCHARGE}}": course.get("subject_incharge", ""),
+        "{{ACADEMIC_COORDINATOR}}": course.get("academic_coordinator", ""),
+        "{{HOD_NAME}}": course.get("hod_name", "")
+    }
+
+    rows = [
+        assignment_row(i, q, bloom_labels[i - 1], *row_settings)
+        for i, q in enumerate(questions_list, start=1)
+    ]
+
+    output_path = os.path.join(output_dir, f"{safe_filename(course['id'])}_Assignment.docx")
+    write_document(output_path, generate_university_docx(data, questions_list, bloom_labels, *row_settings))
+    if pdf:
+        write_document(output_path[:-len(".docx")] + ".pdf", generate_assignment_pdf(data, rows))
+    return len(rows), output_path
+
+
+RUNNERS = {
+    "question_paper": run_question_paper,
+    "assignment": run_assignment
+}
+
+
+# =========================
+# Resumable Batch State
+# =========================
+class BatchState:
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, STATE_FILE)
+        self._lock = threading.Lock()
+        self.records = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.records = json.load(f)
+
+    def is_done(self, course_id):
+        record = self.records.get(course_id)
+        return bool(record and record["status"] == "done" and os.path.exists(record["output"]))
+
+    def record(self, course_id, **fields):
+        with self._lock:
+            self.records[course_id] = fields
+            # Write-then-rename so a crash mid-write never corrupts the state file.
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.records, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+def run_course(course, output_dir, state, pdf=False):
+    started = time.perf_counter()
+    try:
+        with trace.run(course["mode"], course["id"]):
+            questions, output_path = RUNNERS[course["mode"]](course, output_dir, pdf)
+    except Exception as e:
+        state.record(
+            course["id"], mode=course["mode"], status="failed", questions=0,
+            seconds=round(time.perf_counter() - started, 2), output="", error=str(e) or type(e).__name__
+        )
+    else:
+        state.record(
+            course["id"], mode=course["mode"], status="done", questions=questions,
+            seconds=round(time.perf_counter() - started, 2), output=output_path, error=""
+        )
+    return course["id"]
+
+
+def write_report(output_dir, courses, state):
+    path = os.path.join(output_dir, REPORT_FILE)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        for course in courses:
+            record = state.records.get(course["id"], {"mode": course["mode"], "status": "pending"})
+            writer.writerow({"id": course["id"], **{k: record.get(k, "") for k in REPORT_FIELDS[1:]}})
+    return path
+
+
+def run_batch(manifest_path, output_dir, jobs=4, llm_concurrency=LLM_MAX_CONCURRENCY, restart=False, pdf=False):
+    courses = load_manifest(manifest_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Courses run side by side, but every LLM call across all of them goes
+    # through one scheduler, so llm_concurrency is a global cap.
+    configure_scheduler(max_concurrency=llm_concurrency)
+
+    state = BatchState(output_dir)
+    pending = [c for c in courses if restart or not state.is_done(c["id"])]
+    print(f"{len(courses)} courses, {len(courses) - len(pending)} already done, {len(pending)} to run")
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = [pool.submit(run_course, course, output_dir, state, pdf) for course in pending]
+        for future in as_completed(futures):
+            course_id = future.result()
+            record = state.records[course_id]
+            detail = record["output"] if record["status"] == "done" else record["error"]
+            print(f"[{record['status']}] {course_id} ({record['seconds']}s) {detail}")
+
+    report_path = write_report(output_dir, courses, state)
+    failed = [c["id"] for c in courses if state.records.get(c["id"], {}).get("status") != "done"]
+    print(f"Report written to {report_path}; {len(courses) - len(failed)} done, {len(failed)} failed")
+    return not failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m bloomgen.cli",
+        description="Generate question papers and assignments for many courses from a CSV/YAML manifest."
+    )
+    parser.add_argument("manifest", help="CSV or YAML manifest listing one course per row")
+    parser.add_argument("--output-dir", "-o", default="bloomgen_output", help="where DOCX files and the report go")
+    parser.add_argument("--jobs", "-j", type=int, default=4, help="courses generated in parallel")
+    parser.add_argument(
+        "--llm-concurrency", type=int, default=LLM_MAX_CONCURRENCY,
+        help="maximum in-flight LLM calls across all courses"
+    )
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress and regenerate every course")
+    parser.add_argument("--pdf", action="store_true", help="also write a PDF next to each DOCX")
+    args = parser.parse_args(argv)
+
+    try:
+        ok = run_batch(args.manifest, args.output_dir, args.jobs, args.llm_concurrency, args.restart, args.pdf)
+    except ManifestError as e:
+        parser.error(str(e))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
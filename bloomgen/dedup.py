@@ -0,0 +1,185 @@
+# Near-duplicate question detection with MinHash over content-word shingles.
+#
+# Bloom command verbs and filler words are dropped before shingling, so
+# "Explain X" and "Describe X" reduce to the same feature set. Signatures are
+# computed for a whole batch of questions in one NumPy pass, and lookups
+# against a large index (a subject's question bank) go through LSH band
+# keys, so the work stays proportional to the candidates, not to all pairs.
+import os
+import re
+import zlib
+from itertools import chain
+
+import numpy as np
+
+# =========================
+# Dedup Settings
+# =========================
+DEDUP_THRESHOLD = float(os.getenv("BLOOMGEN_DEDUP_THRESHOLD", "0.6"))
+NUM_PERMUTATIONS = 64
+# 16 bands of 4 rows: pairs at Jaccard 0.6 share at least one band ~92% of the time.
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+# Bounds the (features x permutations) hashing scratch array and the pairwise block.
+MAX_FEATURES_PER_PASS = 65536
+QUERY_BLOCK = 64
+
+_rng = np.random.default_rng(0x5EED)
+_PERM_A = _rng.integers(1, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64)
+_BAND_MIX = _rng.integers(1, 2 ** 63, LSH_ROWS, dtype=np.uint64) | np.uint64(1)
+
+IGNORED_WORDS = frozenset(
+    # Bloom command verbs, which the prompts rotate through per bucket.
+    "explain describe illustrate summarize summarise define discuss outline state list identify write "
+    "solve demonstrate implement apply use show calculate compute construct design develop "
+    "analyze analyse compare contrast differentiate distinguish evaluate justify assess examine critically "
+    # Filler.
+    "a an the of in on for to and or with its their this that these those what how why which is are be "
+    "by from as at into using between detail briefly suitable example examples given any two".split()
+)
+
+
+def question_features(text):
+    words = [w.rstrip("s") if len(w) > 4 else w for w in re.findall(r"[a-z0-9]+", (text or "").lower())]
+    words = [w for w in words if w not in IGNORED_WORDS]
+    shingles = set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+    return [zlib.crc32(s.encode("utf-8")) for s in shingles]
+
+
+def minhash_signatures(texts):
+    # One row of NUM_PERMUTATIONS minimum hashes per text. Texts with no content
+    # words get an all-max row and are flagged so they never count as duplicates.
+    features = [question_features(t) for t in texts]
+    lengths = np.fromiter((len(f) for f in features), dtype=np.int64, count=len(features))
+    signatures = np.full((len(texts), NUM_PERMUTATIONS), np.iinfo(np.uint32).max, dtype=np.uint32)
+
+    start = 0
+    while start < len(texts):
+        # Take as many texts as fit in one hashing pass (always at least one).
+        stop = start + 1
+        budget = lengths[start]
+        while stop < len(texts) and budget + lengths[stop] <= MAX_FEATURES_PER_PASS:
+            budget += lengths[stop]
+            stop += 1
+
+        block = np.arange(start, stop)
+        block = block[lengths[block] > 0]
+        if len(block):
+            flat = np.fromiter(
+                chain.from_iterable(features[i] for i in block), dtype=np.uint64, count=int(lengths[block].sum())
+            )
+            # Multiply-shift hashing: 64 independent permutations in one broadcast.
+            hashed = ((flat[:, None] * _PERM_A + _PERM_B) >> np.uint64(32)).astype(np.uint32)
+            offsets = np.concatenate(([0], np.cumsum(lengths[block])[:-1]))
+            signatures[block] = np.minimum.reduceat(hashed, offsets, axis=0)
+        start = stop
+
+    return signatures, lengths > 0
+
+
+def band_keys(signatures):
+    bands = signatures.reshape(len(signatures), LSH_BANDS, LSH_ROWS).astype(np.uint64)
+    return (bands * _BAND_MIX).sum(axis=2)
+
+
+# =========================
+# MinHash LSH Index
+# =========================
+class MinHashIndex:
+    def __init__(self, threshold=DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self._size = 0
+        self._signatures = np.empty((0, NUM_PERMUTATIONS), dtype=np.uint32)
+        # One hash table per band: band key -> rows whose signature has that band.
+        self._buckets = [{} for _ in range(LSH_BANDS)]
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def signatures(self):
+        return self._signatures[:self._size]
+
+    def add(self, signatures):
+        needed = self._size + len(signatures)
+        if needed > len(self._signatures):
+            # Grow geometrically so adding block by block stays linear overall.
+            capacity = max(needed, 2 * len(self._signatures), 256)
+            self._signatures = np.resize(self._signatures, (capacity, NUM_PERMUTATIONS))
+        self._signatures[self._size:needed] = signatures
+
+        for row, keys in enumerate(band_keys(signatures).tolist(), start=self._size):
+            for bucket, key in zip(self._buckets, keys):
+                bucket.setdefault(key, []).append(row)
+        self._size = needed
+
+    def max_similarity(self, signatures):
+        # Best estimated Jaccard similarity of each query against anything in the index.
+        best = np.zeros(len(signatures))
+        if not len(self) or not len(signatures):
+            return best
+
+        # Only pairs sharing at least one LSH band are compared signature to signature.
+        query_rows = []
+        index_rows = []
+        for query, keys in enumerate(band_keys(signatures).tolist()):
+            candidates = set()
+            for bucket, key in zip(self._buckets, keys):
+                candidates.update(bucket.get(key, ()))
+            query_rows.extend([query] * len(candidates))
+            index_rows.extend(candidates)
+
+        if query_rows:
+            query_rows = np.asarray(query_rows)
+            agreement = (signatures[query_rows] == self._signatures[np.asarray(index_rows)]).mean(axis=1)
+            np.maximum.at(best, query_rows, agreement)
+        return best
+
+
+def filter_near_duplicates(texts, index=None, threshold=DEDUP_THRESHOLD, admit=None):
+    # Returns the positions of texts to keep: a text is dropped when it is a near
+    # duplicate of something already in the index or of an earlier kept text.
+    # admit(position), if given, is called in order for each text that passes and
+    # may still refuse it (e.g. its bucket is full). Kept texts are added to the index.
+    index = index if index is not None else MinHashIndex(threshold)
+    signatures, has_content = minhash_signatures(texts)
+    keep = []
+
+    for start in range(0, len(texts), QUERY_BLOCK):
+        block = np.arange(start, min(start + QUERY_BLOCK, len(texts)))
+        block_sigs = signatures[block]
+        against_index = index.max_similarity(block_sigs)
+        within = (block_sigs[:, None, :] == block_sigs[None, :, :]).mean(axis=2)
+
+        kept_in_block = []
+        for i, row in enumerate(block):
+            if has_content[row] and (
+                against_index[i] >= threshold or any(within[i, j] >= threshold for j in kept_in_block)
+            ):
+                continue
+            if admit is not None and not admit(int(row)):
+                continue
+            if has_content[row]:
+                kept_in_block.append(i)
+            keep.append(int(row))
+
+        index.add(block_sigs[kept_in_block])
+
+    return keep
+
+
+class NearDuplicateFilter:
+    # Incremental form for streaming generation: accept() answers one question
+    # at a time, seeded with questions that are already taken.
+    def __init__(self, existing=(), threshold=DEDUP_THRESHOLD):
+        self.index = MinHashIndex(threshold)
+        self.threshold = threshold
+        if existing:
+            filter_near_duplicates(list(existing), self.index, threshold)
+
+    def accept(self, text):
+        return bool(filter_near_duplicates([text], self.index, self.threshold))
+
+    def accept_many(self, texts, admit=None):
+        return filter_near_duplicates(list(texts), self.index, self.threshold, admit)
@@ -0,0 +1,400 @@
+import copy
+import datetime
+import io
+import os
+import re
+import threading
+
+from docx import Document
+from docx.enum.table import WD_CELL_VERTICAL_ALIGNMENT
+from docx.enum.text import WD_LINE_SPACING
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.opc.part import XmlPart
+from docx.shared import Pt
+
+from bloomgen import trace
+from bloomgen.generation import assign_co, assign_po, marks_for_bloom
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_DIR = os.path.join(BASE_DIR, "templates")
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+# =========================
+# DOCX Formatting Helpers
+# =========================
+DOC_FONT_NAME = "Calibri"
+DOC_FONT_SIZE_PT = 11
+ROW_HEIGHT_PT = 24
+
+
+def set_cell_text(
+    cell,
+    text: str,
+    bold: bool = False,
+    font_name: str = DOC_FONT_NAME,
+    font_size_pt: int = DOC_FONT_SIZE_PT
+):
+    cell.text = ""
+    p = cell.paragraphs[0]
+
+    p.paragraph_format.space_before = Pt(0)
+    p.paragraph_format.space_after = Pt(0)
+    p.paragraph_format.line_spacing_rule = WD_LINE_SPACING.SINGLE
+    p.paragraph_format.line_spacing = 1.0
+
+    run = p.add_run(text)
+    run.bold = bold
+    run.font.name = font_name
+    run.font.size = Pt(font_size_pt)
+
+    rPr = run._element.get_or_add_rPr()
+    rFonts = rPr.find(qn("w:rFonts"))
+    if rFonts is None:
+        rFonts = OxmlElement("w:rFonts")
+        rPr.append(rFonts)
+    rFonts.set(qn("w:ascii"), font_name)
+    rFonts.set(qn("w:hAnsi"), font_name)
+
+    cell.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
+
+
+def set_row_height(row, height_pt: int):
+    tr = row._tr
+    trPr = tr.get_or_add_trPr()
+    trHeight = trPr.find(qn("w:trHeight"))
+    if trHeight is None:
+        trHeight = OxmlElement("w:trHeight")
+        trPr.append(trHeight)
+    trHeight.set(qn("w:val"), str(int(height_pt * 20)))
+    trHeight.set(qn("w:hRule"), "exact")
+
+
+# =========================
+# Compiled Row Renderer
+# =========================
+# Formatting a row through python-docx costs a dozen object round trips per
+# cell. Instead, one fully formatted w:tr is built per column grid, font and
+# height, and every question row is a deep copy of it with only the w:t text
+# swapped in.
+_row_prototypes = {}
+_row_prototypes_lock = threading.Lock()
+_PROTOTYPE_TEXT = "x"
+
+
+def compile_row(table, font_name=DOC_FONT_NAME, font_size_pt=DOC_FONT_SIZE_PT, row_height_pt=ROW_HEIGHT_PT):
+    grid = tuple(gridCol.w for gridCol in table._tbl.tblGrid.gridCol_lst)
+    key = (grid, font_name, font_size_pt, row_height_pt)
+
+    with _row_prototypes_lock:
+        prototype = _row_prototypes.get(key)
+    if prototype is not None:
+        return prototype
+
+    row = table.add_row()
+    set_row_height(row, row_height_pt)
+    for cell in row.cells:
+        set_cell_text(cell, _PROTOTYPE_TEXT, font_name=font_name, font_size_pt=font_size_pt)
+    prototype = row._tr
+    prototype.getparent().remove(prototype)
+
+    with _row_prototypes_lock:
+        return _row_prototypes.setdefault(key, prototype)
+
+
+def append_rows(table, rows, font_name=DOC_FONT_NAME, font_size_pt=DOC_FONT_SIZE_PT, row_height_pt=ROW_HEIGHT_PT):
+    prototype = compile_row(table, font_name, font_size_pt, row_height_pt)
+    tbl = table._tbl
+    text_tag = qn("w:t")
+
+    for values in rows:
+        tr = copy.deepcopy(prototype)
+        # The prototype holds exactly one w:t per cell, in column order.
+        for t, value in zip(list(tr.iter(text_tag)), values):
+            text = str(value)
+            if "\n" in text or "\t" in text or "\r" in text:
+                # Let python-docx turn line breaks and tabs into w:br / w:tab.
+                t.getparent().text = text
+                continue
+            t.text = text
+            if text != text.strip():
+                t.set(qn("xml:space"), "preserve")
+        tbl.append(tr)
+
+
+# =========================
+# Template Registry
+# =========================
+# Each template package is parsed once and kept in memory. A render gets a
+# deep copy of the parsed document: XML parts are cloned, while binary parts
+# such as the logo images are shared because rendering never touches them.
+# A template edited on disk is picked up on the next render via its mtime.
+class TemplateRegistry:
+    def __init__(self, template_dir):
+        self.template_dir = template_dir
+        self._lock = threading.Lock()
+        self._templates = {}
+
+    def _load(self, name):
+        path = os.path.join(self.template_dir, name)
+        key = (path, os.path.getmtime(path))
+        with self._lock:
+            entry = self._templates.get(name)
+            if entry is None or entry[0] != key:
+                template = Document(path)
+                shared_parts = {
+                    id(part): part
+                    for part in template.part.package.iter_parts()
+                    if not isinstance(part, XmlPart)
+                }
+                entry = (key, template, shared_parts)
+                self._templates[name] = entry
+        return entry
+
+    def open(self, name):
+        key, template, shared_parts = self._load(name)
+        # Seeding the deepcopy memo makes the binary parts copy to themselves.
+        return copy.deepcopy(template, dict(shared_parts)), key
+
+
+_template_registry = None
+_template_registry_lock = threading.Lock()
+
+
+def get_template_registry() -> TemplateRegistry:
+    global _template_registry
+    with _template_registry_lock:
+        if _template_registry is None:
+            _template_registry = TemplateRegistry(TEMPLATE_DIR)
+        return _template_registry
+
+
+# =========================
+# Placeholder Substitution
+# =========================
+# Each template is scanned once for paragraphs (body and table cells alike)
+# holding {{...}} tokens. Filling a document then only visits those
+# paragraphs and rewrites the w:t text nodes in place, so run formatting
+# around and inside a token survives.
+PLACEHOLDER_PATTERN = re.compile(r"\{\{[^{}]+\}\}")
+
+_placeholder_indexes = {}
+_placeholder_indexes_lock = threading.Lock()
+
+
+def placeholder_key(token):
+    # Templates occasionally carry stray spaces inside a token ({{EXAMINATION _DATE}}).
+    return re.sub(r"\s+", "", token)
+
+
+def placeholder_index(doc, template_key):
+    with _placeholder_indexes_lock:
+        index = _placeholder_indexes.get(template_key)
+    if index is not None:
+        return index
+
+    text_tag = qn("w:t")
+    index = tuple(
+        position
+        for position, p in enumerate(doc.element.body.iter(qn("w:p")))
+        if PLACEHOLDER_PATTERN.search("".join(t.text or "" for t in p.iter(text_tag)))
+    )
+    with _placeholder_indexes_lock:
+        _placeholder_indexes[template_key] = index
+    return index
+
+
+def replace_in_paragraph(p, values):
+    nodes = list(p.iter(qn("w:t")))
+    texts = [t.text or "" for t in nodes]
+    full = "".join(texts)
+
+    # Character offset at which each text node starts within the joined paragraph text.
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text)
+
+    def locate(position):
+        node = len(starts) - 1
+        while node > 0 and starts[node] > position:
+            node -= 1
+        return node
+
+    # Right to left, so earlier offsets stay valid while later tokens are rewritten.
+    for match in reversed(list(PLACEHOLDER_PATTERN.finditer(full))):
+        value = values.get(placeholder_key(match.group()))
+        if value is None:
+            continue
+
+        first = locate(match.start())
+        last = locate(match.end() - 1)
+        head = texts[first][:match.start() - starts[first]]
+        tail = texts[last][match.end() - starts[last]:]
+
+        # The token's first run keeps the value; any runs it spilled into lose their share.
+        for node in range(first + 1, last + 1):
+            texts[node] = ""
+        texts[first] = head + str(value) + (tail if first == last else "")
+        if first != last:
+            texts[last] = tail
+
+    for t, text in zip(nodes, texts):
+        if t.text != text:
+            t.text = text
+            if text != text.strip():
+                t.set(qn("xml:space"), "preserve")
+
+
+def fill_placeholders(doc, template_key, replacements):
+    values = {placeholder_key(k): v for k, v in replacements.items()}
+    index = placeholder_index(doc, template_key)
+    if not index:
+        return
+
+    wanted = set(index)
+    last = index[-1]
+    for position, p in enumerate(doc.element.body.iter(qn("w:p"))):
+        if position in wanted:
+            replace_in_paragraph(p, values)
+        if position >= last:
+            break
+
+
+# =========================
+# Output
+# =========================
+# Documents are rendered into memory. Callers decide whether the bytes go to
+# a download button, the artifact store or a file.
+def document_bytes(doc) -> bytes:
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def assignment_file_name(subject, extension="docx"):
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+    safe_subject = "".join([c for c in (subject or "Subject") if c.isalnum() or c in (" ", "_", "-")]).strip()
+    safe_subject = safe_subject.replace(" ", "_")[:40] or "Subject"
+    return f"University_Assignment_{safe_subject}_{timestamp}.{extension}"
+
+
+def question_paper_file_name(extension="docx"):
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+    return f"Question_Paper_{timestamp}.{extension}"
+
+
+# =========================
+# Assignment DOCX Generator
+# =========================
+@trace.stage("render")
+def generate_university_docx(
+    data_dict,
+    questions_list,
+    bloom_labels,
+    total_cos,
+    total_pos,
+    m_u,
+    m_a,
+    m_ae,
+    font_name=DOC_FONT_NAME,
+    font_size_pt=DOC_FONT_SIZE_PT,
+    row_height_pt=ROW_HEIGHT_PT
+):
+    doc, template_key = get_template_registry().open("assignment_template.docx")
+    fill_placeholders(doc, template_key, data_dict)
+
+    question_table = None
+    for table in doc.tables:
+        if table.rows and "Question No." in table.rows[0].cells[0].text:
+            question_table = table
+            break
+
+    if question_table:
+        rows = []
+        for idx, q in enumerate(questions_list):
+            q = q.strip()
+            if not q:
+                continue
+
+            bloom_label = bloom_labels[idx] if idx < len(bloom_labels) else "Understand"
+            rows.append((
+                f"Q{len(rows) + 1}",
+                q,
+                assign_co(idx, total_cos),
+                assign_po(idx, total_pos),
+                bloom_label,
+                marks_for_bloom(bloom_label, m_u, m_a, m_ae)
+            ))
+
+        append_rows(question_table, rows, font_name, font_size_pt, row_height_pt)
+
+    return document_bytes(doc)
+
+
+# =========================
+# Question Paper DOCX Generator
+# =========================
+@trace.stage("render")
+def generate_question_paper_docx(
+    data_dict,
+    all_rows,
+    font_name=DOC_FONT_NAME,
+    font_size_pt=DOC_FONT_SIZE_PT,
+    row_height_pt=ROW_HEIGHT_PT
+):
+    doc, template_key = get_template_registry().open("question_paper_template.docx")
+
+    replacements = {
+        "{{DEPARTMENT}}": data_dict.get("department", ""),
+        "{{SEMESTER}}": data_dict.get("semester", ""),
+        "{{ACADEMIC_YEAR}}": data_dict.get("academic_year", ""),
+        "{{MAX_MARKS}}": data_dict.get("total_marks", ""),
+        "{{COURSE_NAME}}": data_dict.get("course_name", ""),
+        "{{COURSE_CODE}}": data_dict.get("course_code", ""),
+        "{{SUBJECT_TEACHER}}": data_dict.get("subject_teacher", ""),
+        "{{DURATION}}": data_dict.get("duration", ""),
+        "{{DATE}}": str(data_dict.get("date", "")),
+        "{{EXAMINATION_DATE}}": str(data_dict.get("exam_date", "")),
+        "{{SUBJECT_INCHARGE}}": data_dict.get("subject_incharge", ""),
+        "{{ACADEMIC_COORDINATOR}}": data_dict.get("academic_coordinator", ""),
+        "{{HOD_NAME}}": data_dict.get("hod_name", "")
+    }
+
+    fill_placeholders(doc, template_key, replacements)
+
+    # Split rows by section
+    sections = {
+        "A": [],
+        "B": [],
+        "C": [],
+        "D": [],
+        "E": []
+    }
+
+    for row in all_rows:
+        sections[row["Section"]].append(row)
+
+    # Assumes:
+    # table 0 = logo/header
+    # table 1 = meta info
+    # table 2 = section A table
+    # table 3 = section B table
+    # table 4 = section C table
+    # table 5 = section D table
+    # table 6 = section E table
+    section_tables = doc.tables[2:]
+    section_order = ["A", "B", "C", "D", "E"]
+    columns = ["Question No.", "Question Statement", "CO", "PO", "Bloom’s Level", "Marks"]
+
+    for i, sec in enumerate(section_order):
+        if i >= len(section_tables):
+            break
+
+        if sections[sec]:
+            rows = [[row_data[column] for column in columns] for row_data in sections[sec]]
+            append_rows(section_tables[i], rows, font_name, font_size_pt, row_height_pt)
+
+    return document_bytes(doc)
@@ -0,0 +1,142 @@
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import docx
+
+from bloomgen import trace
+from bloomgen.cache import content_hash, get_extraction_cache
+
+# =========================
+# Parallel Extraction Settings
+# =========================
+# Documents with at least this many pages are split across a process pool;
+# smaller ones are faster to parse in-process than to ship to workers.
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("BLOOMGEN_PARALLEL_PAGE_THRESHOLD", "48"))
+PAGES_PER_TASK = 16
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the Streamlit server process is multi-threaded.
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 2,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _extract_page_range(path, start, stop):
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+# =========================
+# Page Extractors
+# =========================
+# Generators, so the text is joined once at the end instead of grown page by page.
+def iter_pdf_pages(data: bytes, page_range=None):
+    # PyPDF2 loads with the first PDF rather than with the app.
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    start, stop = page_range or (0, None)
+    stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+
+    if stop - start < PARALLEL_PAGE_THRESHOLD:
+        for i in range(start, stop):
+            yield reader.pages[i].extract_text() or ""
+        return
+
+    # Workers reopen the PDF from a temp file rather than receiving the bytes in
+    # every task. Ranges are yielded in page order as each one finishes.
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    futures = []
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+        pool = _get_pool()
+        futures = [
+            pool.submit(_extract_page_range, path, s, min(s + PAGES_PER_TASK, stop))
+            for s in range(start, stop, PAGES_PER_TASK)
+        ]
+        for future in futures:
+            yield from future.result()
+    finally:
+        # A consumer that stops early (or an error) leaves tasks behind: drop the
+        # ones not started and let running ones finish before the file goes.
+        for future in futures:
+            future.cancel()
+        wait(futures)
+        os.remove(path)
+
+
+def iter_docx_paragraphs(data: bytes):
+    doc = docx.Document(io.BytesIO(data))
+    for para in doc.paragraphs:
+        yield para.text
+
+
+def iter_document_text(data: bytes, filename: str, page_range=None):
+    filename = filename.lower()
+
+    if filename.endswith(".pdf"):
+        for page_text in iter_pdf_pages(data, page_range):
+            if page_text:
+                yield page_text
+
+    elif filename.endswith(".docx"):
+        yield from iter_docx_paragraphs(data)
+
+
+# Chunking does not start on a partial document: chunk hashes key the summary
+# cache and the question bank on the whole syllabus, so split_syllabus always
+# runs on the joined text. page_range is how a caller parses less of it.
+def extract_document_text(data: bytes, filename: str, page_range=None) -> str:
+    return "".join(part + "\n" for part in iter_document_text(data, filename, page_range))
+
+
+# =========================
+# Cached Extraction
+# =========================
+# Parsed text is keyed on the file bytes (plus extension, which picks the parser),
+# so the same file uploaded under any name or for another course is never re-parsed.
+# source is a path or an uploaded file object with .name and .getvalue().
+# page_range=(start, stop) limits PDF parsing to those pages.
+def extract_text(source, page_range=None):
+    if source is None:
+        return ""
+
+    if isinstance(source, (str, os.PathLike)):
+        filename = os.fspath(source).lower()
+        with open(source, "rb") as f:
+            data = f.read()
+    else:
+        filename = source.name.lower()
+        data = source.getvalue()
+
+    cache = get_extraction_cache()
+    key = content_hash(os.path.splitext(filename)[1], data, page_range)
+
+    with trace.span("extract", os.path.splitext(filename)[1].lstrip(".")) as stage:
+        text = cache.get(key)
+        stage.set(cache_hits=int(text is not None), cache_misses=int(text is None))
+        if text is None:
+            started = time.perf_counter()
+            text = extract_document_text(data, filename, page_range)
+            cache.record_parse(time.perf_counter() - started)
+            cache.put(key, text)
+
+    return text
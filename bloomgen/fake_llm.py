@@ -0,0 +1,116 @@
+# Deterministic stand-in for the Groq chat model, used by the benchmark suite
+# and the load-test provider server. Replies are derived from the prompt alone
+# (the same prompt always gets the same reply) and follow the output contract
+# of each prompt in bloomgen.generation: bullet summaries, the structured JSON
+# question set, and one-question-per-line lists.
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Any, Callable, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+FAKE_TOPICS = (
+    "paging segmentation thrashing deadlock semaphore monitor mutex scheduler dispatcher interrupt "
+    "pipeline cache-coherence virtual-memory page-table inode journaling RAID checksum sliding-window "
+    "congestion-control routing subnetting DNS TCP UDP normalization indexing B-tree hashing "
+    "transaction isolation locking recovery query-optimizer join heap stack queue graph spanning-tree "
+    "shortest-path dynamic-programming greedy-method backtracking recursion sorting searching "
+    "regression classification clustering overfitting gradient-descent backpropagation encryption "
+    "authentication firewall compiler parser lexer register-allocation microservices containers "
+    "load-balancer replication consensus"
+).split()
+
+BUCKET_VERBS = {
+    "Understand": ["Explain", "Describe", "Illustrate", "Summarize"],
+    "Apply": ["Solve", "Demonstrate", "Implement", "Apply"],
+    "Analyze/Evaluate": ["Analyze", "Compare", "Differentiate", "Evaluate", "Justify"]
+}
+
+SUMMARY_BULLETS = 12
+STREAM_CHUNK_CHARS = 24
+
+_calls_lock = threading.Lock()
+
+
+def fake_question(rng, bucket):
+    verb = rng.choice(BUCKET_VERBS.get(bucket, BUCKET_VERBS["Understand"]))
+    a, b, c = (t.replace("-", " ") for t in rng.sample(FAKE_TOPICS, 3))
+    return f"{verb} the role of {a} in {b} with reference to {c}."
+
+
+def fake_reply(prompt: str) -> str:
+    rng = random.Random(zlib.crc32(prompt.encode("utf-8")))
+
+    if "Summarize the syllabus" in prompt or "Merge these partial" in prompt:
+        topics = rng.sample(FAKE_TOPICS, SUMMARY_BULLETS)
+        return "\n".join(f"- {t.replace('-', ' ')}: definition, working and applications" for t in topics)
+
+    structured = re.search(r"Questions required per Bloom bucket:\n((?:- .+: \d+\n?)+)", prompt)
+    if structured:
+        counts = re.findall(r"- (.+): (\d+)", structured.group(1))
+        return json.dumps({bucket: [fake_question(rng, bucket) for _ in range(int(n))] for bucket, n in counts})
+
+    count = re.search(r"Generate exactly (\d+)", prompt)
+    bucket = re.search(r"Bloom (?:Bucket|Level): (.+)", prompt)
+    n = int(count.group(1)) if count else 3
+    return "\n".join(fake_question(rng, bucket.group(1).strip() if bucket else "Understand") for _ in range(n))
+
+
+class FakeChatModel(BaseChatModel):
+    # latency_seconds (plus up to jitter_seconds, fixed per prompt) is slept before
+    # each reply, before the first chunk when streaming. reply_fn maps the prompt
+    # to the reply text.
+    latency_seconds: float = 0.0
+    jitter_seconds: float = 0.0
+    reply_fn: Callable[[str], str] = fake_reply
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "bloomgen-fake"
+
+    def _reply(self, messages):
+        prompt = messages[-1].content if messages else ""
+        with _calls_lock:
+            self.calls += 1
+        delay = self.latency_seconds
+        if self.jitter_seconds:
+            delay += self.jitter_seconds * (zlib.crc32(prompt.encode("utf-8")) % 1000) / 1000
+        if delay:
+            time.sleep(delay)
+        reply = self.reply_fn(prompt)
+        usage = {"input_tokens": len(prompt) // 4, "output_tokens": len(reply) // 4,
+                 "total_tokens": (len(prompt) + len(reply)) // 4}
+        return reply, usage
+
+    def _generate(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        reply, usage = self._reply(messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply, usage_metadata=usage))])
+
+    def _stream(
+        self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        reply, usage = self._reply(messages)
+        for start in range(0, len(reply), STREAM_CHUNK_CHARS):
+            last = start + STREAM_CHUNK_CHARS >= len(reply)
+            chunk = AIMessageChunk(content=reply[start:start + STREAM_CHUNK_CHARS], usage_metadata=usage if last else None)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.content)
+            yield ChatGenerationChunk(message=chunk)
+
+
+def install_fake_llm(latency_seconds=0.0, jitter_seconds=0.0, reply_fn=fake_reply) -> FakeChatModel:
+    # Replaces the process-wide client; the chains are rebuilt around it on next use.
+    from bloomgen import generation
+
+    model = FakeChatModel(latency_seconds=latency_seconds, jitter_seconds=jitter_seconds, reply_fn=reply_fn)
+    with generation._llm_lock, generation._chains_lock:
+        generation._llm = model
+        generation._chains = None
+    return model
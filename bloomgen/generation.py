@@ -0,0 +1,717 @@
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+import httpx
+from langchain_core.exceptions import OutputParserException
+from langchain_core.utils.json import parse_json_markdown
+from pydantic import TypeAdapter, ValidationError
+
+from bloomgen import trace
+from bloomgen.bank import QUESTION_BANK_ENABLED, get_question_bank
+from bloomgen.cache import content_hash, get_summary_cache
+from bloomgen.dedup import NearDuplicateFilter
+from bloomgen.extract import extract_text
+from bloomgen.llm import LLM_MAX_COMPLETION_TOKENS, LLM_MAX_CONCURRENCY, get_scheduler
+from bloomgen.retrieval import CONTEXT_TOKEN_BUDGET, SECTION_CONTEXT_TOKEN_BUDGET, chunk_index, chunk_tokens
+
+# =========================
+# LLM Client
+# =========================
+LLM_MODEL_NAME = "openai/gpt-oss-120b"
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("BLOOMGEN_HTTP_MAX_CONNECTIONS", "20"))
+# Upper bound on the summary text sent with each generation prompt.
+SUMMARY_TOKEN_BUDGET = int(os.getenv("BLOOMGEN_SUMMARY_TOKENS", "2400"))
+SUMMARY_MERGE_FANIN = 4
+
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def get_llm():
+    # One client per process: its pooled keep-alive connections are shared by
+    # every session, job and request instead of a fresh TLS handshake per call.
+    global _llm
+    with _llm_lock:
+        if _llm is None:
+            # Imported on first use: langchain_groq is the slowest import in the
+            # package, and pages that only render forms never make an LLM call.
+            from langchain_groq import ChatGroq
+
+            limits = httpx.Limits(
+                max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_HTTP_MAX_CONNECTIONS
+            )
+            timeout = httpx.Timeout(60.0, connect=10.0)
+            _llm = ChatGroq(
+                groq_api_key=os.getenv("GROQ_API_KEY"),
+                model_name=LLM_MODEL_NAME,
+                temperature=0.4,
+                max_tokens=LLM_MAX_COMPLETION_TOKENS,
+                # Retries belong to the scheduler, which paces them across callers.
+                max_retries=0,
+                http_client=httpx.Client(limits=limits, timeout=timeout),
+                http_async_client=httpx.AsyncClient(limits=limits, timeout=timeout)
+            )
+        return _llm
+
+
+# =========================
+# Prompts
+# =========================
+# Plain strings here; get_chains() compiles them once per process, so importing
+# this module does not load LangChain's prompt and parser stack.
+SUMMARY_TEMPLATE = """
+You are helping create university exam/assignment questions.
+
+Summarize the syllabus into compact bullet points (max 350 words).
+Keep only exam-relevant units/topics/subtopics/keywords.
+No extra explanation.
+
+SYLLABUS:
+{syllabus}
+"""
+
+MERGE_TEMPLATE = """
+You are helping create university exam/assignment questions.
+
+Merge these partial syllabus summaries into one set of compact bullet points (max 350 words).
+Keep the exam-relevant topics/subtopics/keywords of every part and drop repeats.
+No extra explanation.
+
+PARTIAL SUMMARIES:
+{summaries}
+"""
+
+STRUCTURED_TEMPLATE = """
+You are an academic question paper setter.
+
+Generate university-level descriptive questions for every Bloom bucket listed below.
+
+Subject: {subject}
+
+Questions required per Bloom bucket:
+{bucket_counts}
+
+STRICT OUTPUT RULES:
+- Output ONLY a JSON object. No markdown fences, no commentary.
+- Use each Bloom bucket name above, spelled exactly as given, as a key.
+- Each value is a list of question strings with exactly the required number of questions.
+- No numbering or bullets inside the question strings.
+- Keep questions exam-oriented and concise.
+- Use action verbs that match the Bloom bucket:
+  - Understand: Explain, Describe, Illustrate, Summarize
+  - Apply: Solve, Demonstrate, Implement, Apply
+  - Analyze/Evaluate: Analyze, Compare, Differentiate, Evaluate, Justify
+
+Do NOT repeat any of these existing questions:
+{avoid}
+
+Syllabus Summary (use ONLY this):
+{syllabus}
+"""
+
+BLOOM_TEMPLATE = """
+You are an academic question paper setter.
+
+Generate exactly {count} university-level descriptive questions.
+
+Subject: {subject}
+Bloom Bucket: {bloom_bucket}
+
+STRICT OUTPUT RULES:
+- Output ONLY questions.
+- One question per line.
+- No numbering, no bullets, no headings, no blank lines.
+- Keep questions exam-oriented and concise.
+- Use action verbs that match the Bloom bucket:
+  - Understand: Explain, Describe, Illustrate, Summarize
+  - Apply: Solve, Demonstrate, Implement, Apply
+  - Analyze/Evaluate: Analyze, Compare, Differentiate, Evaluate, Justify
+
+Syllabus Summary (use ONLY this):
+{syllabus}
+"""
+
+SECTION_TEMPLATE = """
+You are a university exam question setter.
+
+Generate exactly {count} questions.
+
+Subject: {subject}
+Marks per Question: {marks}
+Question Style: {style}
+Bloom Level: {bloom_hint}
+
+RULES:
+- Output only questions
+- One question per line
+- No numbering
+- No bullets
+- No headings
+- Questions must be suitable for {marks} marks
+- Keep the style aligned to {style}
+
+Do NOT repeat any of these existing questions:
+{avoid}
+
+Unit Summary:
+{unit_summary}
+"""
+
+_chains = None
+_chains_lock = threading.Lock()
+
+
+def get_chains():
+    global _chains
+    with _chains_lock:
+        if _chains is None:
+            from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
+            from langchain_core.prompts import ChatPromptTemplate
+
+            llm = get_llm()
+            prompts = {
+                name: ChatPromptTemplate.from_template(template) for name, template in (
+                    ("summary", SUMMARY_TEMPLATE),
+                    ("merge", MERGE_TEMPLATE),
+                    ("structured", STRUCTURED_TEMPLATE),
+                    ("bloom", BLOOM_TEMPLATE),
+                    ("section", SECTION_TEMPLATE)
+                )
+            }
+            chains = {
+                "summary": prompts["summary"] | llm | StrOutputParser(),
+                "merge": prompts["merge"] | llm | StrOutputParser(),
+                "structured": prompts["structured"] | llm | StrOutputParser(),
+                "structured_stream": prompts["structured"] | llm | JsonOutputParser(),
+                "bloom": prompts["bloom"] | llm | StrOutputParser(),
+                "section": prompts["section"] | llm | StrOutputParser()
+            }
+            # The run name labels each chain's calls in traces.
+            _chains = {name: chain.with_config(run_name=name) for name, chain in chains.items()}
+        return _chains
+
+
+# =========================
+# Concurrent Fan-out
+# =========================
+def run_llm_batch(chain, payloads, max_concurrency=None):
+    # Results come back in the same order as payloads, whatever order the calls finish in.
+    scheduler = get_scheduler()
+    payloads = list(payloads)
+    workers = max(1, min(max_concurrency or LLM_MAX_CONCURRENCY, len(payloads)))
+    if workers == 1:
+        return [scheduler.invoke(chain, p) for p in payloads]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(trace.bind(lambda p: scheduler.invoke(chain, p)), payloads))
+
+
+# =========================
+# Syllabus Chunking Helpers
+# =========================
+@trace.stage("split")
+def split_syllabus(text: str, chunk_size: int = 2400, chunk_overlap: int = 200):
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+    return splitter.split_text(text or "")
+
+
+def safe_join(parts, sep="\n\n"):
+    return sep.join([p for p in parts if p and p.strip()])
+
+
+# =========================
+# Cached Chunk Summaries
+# =========================
+# Keyed on input text + prompt + model, so an unchanged syllabus never
+# re-summarizes and a prompt or model change invalidates old entries.
+def run_cached_batch(chain_name, payloads, keys, max_concurrency=None):
+    cache = get_summary_cache()
+    with trace.span("summarize", chain_name) as stage:
+        results = [cache.get(k) for k in keys]
+
+        missing = [i for i, r in enumerate(results) if r is None]
+        stage.set(cache_hits=len(keys) - len(missing), cache_misses=len(missing))
+        fresh = run_llm_batch(get_chains()[chain_name], [payloads[i] for i in missing], max_concurrency)
+        for i, result in zip(missing, fresh):
+            results[i] = result
+            cache.put(keys[i], result)
+
+    return results
+
+
+def summarize_chunks(chunks, max_concurrency=None):
+    return run_cached_batch(
+        "summary",
+        [{"syllabus": ch} for ch in chunks],
+        [content_hash(ch, SUMMARY_TEMPLATE, LLM_MODEL_NAME) for ch in chunks],
+        max_concurrency
+    )
+
+
+# Map-reduce: chunk summaries are merged SUMMARY_MERGE_FANIN at a time, level
+# by level, until the joined text fits the budget. Each level runs in parallel
+# and every merge is cached like a chunk summary, so a syllabus that shares
+# most chunks with an earlier one only re-merges the groups that changed.
+def summarize_hierarchical(chunks, token_budget=SUMMARY_TOKEN_BUDGET, max_concurrency=None):
+    level = [s for s in summarize_chunks(chunks, max_concurrency) if s and s.strip()]
+
+    while len(level) > 1 and chunk_tokens(safe_join(level)) > token_budget:
+        groups = [level[i:i + SUMMARY_MERGE_FANIN] for i in range(0, len(level), SUMMARY_MERGE_FANIN)]
+        merged = run_cached_batch(
+            "merge",
+            [{"summaries": safe_join(g)} for g in groups if len(g) > 1],
+            [content_hash(*g, MERGE_TEMPLATE, LLM_MODEL_NAME) for g in groups if len(g) > 1],
+            max_concurrency
+        )
+        # A trailing single summary has nothing to merge with and moves up as is.
+        level = merged + [g[0] for g in groups if len(g) == 1]
+
+    return safe_join(level)
+
+
+# =========================
+# Bloom Count Helper
+# =========================
+def normalize_bloom_percentages(pct_u: int, pct_a: int, pct_ae: int):
+    total_pct = pct_u + pct_a + pct_ae
+    if total_pct == 0:
+        pct_u, pct_a, pct_ae = 30, 30, 40
+        total_pct = 100
+
+    pct_u = round((pct_u / total_pct) * 100)
+    pct_a = round((pct_a / total_pct) * 100)
+    return pct_u, pct_a, 100 - pct_u - pct_a
+
+
+def compute_bloom_counts(total_questions: int, pct_u: int, pct_a: int, pct_ae: int):
+    u = round(total_questions * pct_u / 100)
+    a = round(total_questions * pct_a / 100)
+    ae = total_questions - u - a
+    return {
+        "Understand": max(0, u),
+        "Apply": max(0, a),
+        "Analyze/Evaluate": max(0, ae)
+    }
+
+
+# =========================
+# Question Line Parsing
+# =========================
+def clean_question(line: str) -> str:
+    return line.strip().lstrip("-•").strip()
+
+
+def iter_stream_lines(chunks):
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        yield from lines
+    if buffer:
+        yield buffer
+
+
+# =========================
+# Structured Bloom Output
+# =========================
+STRUCTURED_TOPUP_ROUNDS = 2
+question_set_schema = TypeAdapter(Dict[str, List[str]])
+
+
+def parse_question_set(raw: str, bucket_counts):
+    # A reply that is not a {bucket: [question, ...]} object counts as empty,
+    # so the top-up round asks again for the whole shortfall.
+    try:
+        # What JsonOutputParser.parse does, minus loading the parser module.
+        data = question_set_schema.validate_python(parse_json_markdown(raw.strip()))
+    except (ValueError, ValidationError):
+        return {}
+
+    parsed = {}
+    for bucket in bucket_counts:
+        questions = [clean_question(q) for q in data.get(bucket, [])]
+        parsed[bucket] = [q for q in questions if q]
+    return parsed
+
+
+# While streaming, every item but the last in a bucket's list is final; the
+# last one may still be growing until the next item or the stream end.
+def stream_question_set(payload, bucket_counts):
+    emitted = {b: 0 for b in bucket_counts}
+    partial = {}
+    try:
+        for partial in get_scheduler().stream(get_chains()["structured_stream"], payload):
+            if not isinstance(partial, dict):
+                continue
+            for bucket in bucket_counts:
+                items = partial.get(bucket)
+                if not isinstance(items, list):
+                    continue
+                for item in items[emitted[bucket]:-1]:
+                    emitted[bucket] += 1
+                    if isinstance(item, str):
+                        yield bucket, clean_question(item)
+    except OutputParserException:
+        return
+
+    if isinstance(partial, dict):
+        for bucket in bucket_counts:
+            items = partial.get(bucket)
+            if isinstance(items, list):
+                for item in items[emitted[bucket]:]:
+                    if isinstance(item, str):
+                        yield bucket, clean_question(item)
+
+
+def generate_structured_pairs(subject, syllabus_summary, bloom_counts, on_question=None, avoid=()):
+    collected = {b: [] for b, n in bloom_counts.items() if n > 0}
+    # Near-duplicates ("Explain X" in one bucket, "Describe X" in another) are
+    # rejected, which leaves their slots missing for the next top-up round.
+    dedup = NearDuplicateFilter(avoid)
+
+    def accept(bucket, q):
+        if not q or len(collected[bucket]) >= bloom_counts[bucket] or not dedup.accept(q):
+            return
+        collected[bucket].append(q)
+        if on_question:
+            on_question(q, bucket)
+
+    for _ in range(1 + STRUCTURED_TOPUP_ROUNDS):
+        missing = {
+            b: bloom_counts[b] - len(qs)
+            for b, qs in collected.items()
+            if len(qs) < bloom_counts[b]
+        }
+        if not missing:
+            break
+
+        existing = list(avoid) + [q for qs in collected.values() for q in qs]
+        payload = {
+            "subject": subject,
+            "syllabus": syllabus_summary,
+            "bucket_counts": "\n".join(f"- {b}: {n}" for b, n in missing.items()),
+            "avoid": "\n".join(f"- {q}" for q in existing) or "(none yet)"
+        }
+
+        if on_question:
+            for bucket, q in stream_question_set(payload, missing):
+                accept(bucket, q)
+        else:
+            raw = get_scheduler().invoke(get_chains()["structured"], payload)
+            candidates = [(bucket, q) for bucket, qs in parse_question_set(raw, missing).items() for q in qs]
+
+            # Only questions that take a slot are indexed; overflow from a full
+            # bucket must not block a near match in the next round.
+            def take(i):
+                bucket, q = candidates[i]
+                if len(collected[bucket]) >= bloom_counts[bucket]:
+                    return False
+                collected[bucket].append(q)
+                return True
+
+            dedup.accept_many((q for _, q in candidates), admit=take)
+
+    return [(q, b) for b, qs in collected.items() for q in qs]
+
+
+# =========================
+# Batched Bloom Output
+# =========================
+def generate_batched_pairs(subject, bucket_summaries, bloom_counts, max_concurrency=None):
+    # bucket_summaries holds each bucket's own retrieved context.
+    batch_size = 6
+    batch_buckets = []
+    batch_payloads = []
+
+    for bloom_bucket, bucket_count in bloom_counts.items():
+        if bucket_count <= 0:
+            continue
+
+        rounds = math.ceil(bucket_count / batch_size)
+
+        for i in range(rounds):
+            this_batch = batch_size if i < rounds - 1 else (bucket_count - batch_size * i)
+
+            batch_buckets.append(bloom_bucket)
+            batch_payloads.append({
+                "subject": subject,
+                "syllabus": bucket_summaries[bloom_bucket],
+                "count": this_batch,
+                "bloom_bucket": bloom_bucket
+            })
+
+    outputs = run_llm_batch(get_chains()["bloom"], batch_payloads, max_concurrency)
+
+    final_pairs = []
+    for bloom_bucket, out in zip(batch_buckets, outputs):
+        for line in out.split("\n"):
+            q = clean_question(line)
+            if q:
+                final_pairs.append((q, bloom_bucket))
+
+    return final_pairs
+
+
+# =========================
+# Assignment Question Generator
+# =========================
+@trace.stage("generate")
+def generate_questions(
+    subject, syllabus, count, pct_u, pct_a, pct_ae,
+    max_concurrency=None, structured=True, on_question=None, use_bank=QUESTION_BANK_ENABLED
+):
+    chunks = split_syllabus(syllabus, chunk_size=2400, chunk_overlap=200)
+    bloom_counts = compute_bloom_counts(count, pct_u, pct_a, pct_ae)
+
+    # Bank first: only the shortfall per bucket goes to the LLM, and a fully
+    # banked request skips summarization as well.
+    source_hash = content_hash(*chunks)
+    banked = []
+    if use_bank:
+        banked = get_question_bank().take(subject, bloom_counts, source_hash, topic=safe_join(chunks))
+        if on_question:
+            for q, bucket in banked:
+                on_question(q, bucket)
+
+    shortfall = {b: n - sum(1 for _, bb in banked if bb == b) for b, n in bloom_counts.items()}
+    fresh_pairs = []
+    if any(n > 0 for n in shortfall.values()):
+        # Every chunk is a candidate; each bucket still short retrieves its own
+        # most relevant ones, and only those are summarized.
+        selection = chunk_index(tuple(chunks)).select_many(
+            [b for b, n in shortfall.items() if n > 0], CONTEXT_TOKEN_BUDGET
+        )
+        selected = [chunks[i] for i in sorted(set().union(*selection.values()))]
+        banked_questions = [q for q, _ in banked]
+
+        if structured:
+            syllabus_summary = summarize_hierarchical(selected, max_concurrency=max_concurrency)
+            fresh_pairs = generate_structured_pairs(
+                subject, syllabus_summary, shortfall, on_question, avoid=banked_questions
+            )
+        else:
+            # Batched calls are per bucket, so each carries only its own chunks. All
+            # picked chunks are summarized in one parallel pass first; the per-bucket
+            # reductions then read those summaries from the cache.
+            summarize_chunks(selected, max_concurrency)
+            bucket_summaries = {
+                b: summarize_hierarchical([chunks[i] for i in selection[b]], max_concurrency=max_concurrency)
+                for b in selection
+            }
+            dedup = NearDuplicateFilter(banked_questions)
+            needed = dict(shortfall)
+            for _ in range(1 + STRUCTURED_TOPUP_ROUNDS):
+                if not any(n > 0 for n in needed.values()):
+                    break
+                # Only the slots left open by short replies or dropped duplicates are requested again.
+                batch = generate_batched_pairs(subject, bucket_summaries, needed, max_concurrency)
+
+                # Overflow from a full bucket stays out of the dedup index.
+                def take(i):
+                    q, bucket = batch[i]
+                    if needed[bucket] <= 0:
+                        return False
+                    needed[bucket] -= 1
+                    fresh_pairs.append((q, bucket))
+                    return True
+
+                dedup.accept_many((q for q, _ in batch), admit=take)
+            if on_question:
+                for q, bucket in fresh_pairs:
+                    on_question(q, bucket)
+
+        if use_bank:
+            get_question_bank().add(subject, fresh_pairs, source_hash=source_hash, used=True)
+
+    # Keep the bucket order the generators produce: Understand, Apply, Analyze/Evaluate.
+    final_pairs = [(q, b) for bucket in bloom_counts for q, b in banked + fresh_pairs if b == bucket]
+    return final_pairs[:count]
+
+
+# =========================
+# Question Paper Generators
+# =========================
+@trace.stage("generate")
+def generate_section_questions(
+    subject, unit_text, count, marks, style, bloom_hint,
+    max_concurrency=None, on_question=None, use_bank=QUESTION_BANK_ENABLED
+):
+    chunks = split_syllabus(unit_text, chunk_size=2200, chunk_overlap=150)
+
+    source_hash = content_hash(*chunks)
+    questions = []
+    if use_bank:
+        banked = get_question_bank().take(
+            subject, {bloom_hint: count}, source_hash, marks=str(marks), topic=safe_join(chunks)
+        )
+        for q, _ in banked:
+            questions.append(q)
+            if on_question:
+                on_question(q)
+
+    shortfall = count - len(questions)
+    if shortfall <= 0:
+        return questions[:count]
+
+    selected = chunk_index(tuple(chunks)).select(bloom_hint, SECTION_CONTEXT_TOKEN_BUDGET)
+    unit_summary = summarize_hierarchical([chunks[i] for i in selected], max_concurrency=max_concurrency)
+
+    chain = get_chains()["section"]
+
+    dedup = NearDuplicateFilter(questions)
+    fresh = []
+    for _ in range(1 + STRUCTURED_TOPUP_ROUNDS):
+        needed = shortfall - len(fresh)
+        if needed <= 0:
+            break
+
+        payload = {
+            "subject": subject,
+            "count": needed,
+            "marks": marks,
+            "style": style,
+            "bloom_hint": bloom_hint,
+            "unit_summary": unit_summary,
+            "avoid": "\n".join(f"- {q}" for q in questions + fresh) or "(none yet)"
+        }
+
+        if on_question:
+            for line in iter_stream_lines(get_scheduler().stream(chain, payload)):
+                q = clean_question(line)
+                if q and len(fresh) < shortfall and dedup.accept(q):
+                    fresh.append(q)
+                    on_question(q)
+        else:
+            lines = get_scheduler().invoke(chain, payload).split("\n")
+            candidates = [q for q in (clean_question(line) for line in lines) if q]
+
+            # Candidates past the shortfall stay out of the dedup index.
+            def take(i):
+                if len(fresh) >= shortfall:
+                    return False
+                fresh.append(candidates[i])
+                return True
+
+            dedup.accept_many(candidates, admit=take)
+    if use_bank:
+        get_question_bank().add(
+            subject, [(q, bloom_hint) for q in fresh], source_hash=source_hash, marks=marks, used=True
+        )
+
+    return questions + fresh
+
+
+# =========================
+# Section Pipeline
+# =========================
+# Each section runs extract -> summarize -> generate on its own worker, so a
+# section starts generating as soon as its own unit is summarized and a slow
+# unit only delays its own section. LLM calls still share the scheduler.
+def generate_paper_sections(
+    subject, section_specs, max_concurrency=None, on_question=None, use_bank=QUESTION_BANK_ENABLED
+):
+    def run_section(spec):
+        section_name, unit_file, count, marks, style, bloom_hint = spec
+        unit_text = extract_text(unit_file)
+        return generate_section_questions(
+            subject, unit_text, count, marks, style, bloom_hint, max_concurrency,
+            (lambda q: on_question(section_name, q)) if on_question else None,
+            use_bank
+        )
+
+    results = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(section_specs))) as pool:
+        futures = {pool.submit(trace.bind(run_section), spec): spec[0] for spec in section_specs}
+        for future in as_completed(futures):
+            section_name = futures[future]
+            try:
+                results[section_name] = future.result()
+            except Exception as e:
+                errors[section_name] = str(e)
+
+    return results, errors
+
+
+# =========================
+# CO / PO Helpers
+# =========================
+def assign_co(index: int, total_cos: int) -> str:
+    return f"CO{(index % total_cos) + 1}" if total_cos > 0 else ""
+
+
+def assign_po(index: int, total_pos: int) -> str:
+    return f"PO{(index % total_pos) + 1}" if total_pos > 0 else ""
+
+
+def marks_for_bloom(bloom_label: str, m_u: int, m_a: int, m_ae: int) -> str:
+    if bloom_label == "Understand":
+        return str(m_u)
+    if bloom_label == "Apply":
+        return str(m_a)
+    return str(m_ae)
+
+
+# =========================
+# Preview Rows
+# =========================
+def assignment_row(i, q, bloom, total_cos, total_pos, m_u, m_a, m_ae):
+    return {
+        "Question No.": f"Q{i}",
+        "Question Statement": q,
+        "CO": assign_co(i - 1, total_cos),
+        "PO": assign_po(i - 1, total_pos),
+        "Bloom’s Level": bloom,
+        "Marks": marks_for_bloom(bloom, m_u, m_a, m_ae)
+    }
+
+
+# (section, unit number, questions printed, marks each, style, Bloom level, fallback question)
+QUESTION_PAPER_SECTIONS = [
+    ("A", 1, 3, 2, "brief answer", "Understand", "Explain an important concept from Unit 1."),
+    ("B", 2, 3, 2, "brief answer", "Apply", "Explain an important concept from Unit 2."),
+    ("C", 3, 3, 5, "descriptive", "Analyze/Evaluate", "Discuss an important concept from Unit 3."),
+    ("D", 4, 3, 5, "descriptive", "Analyze/Evaluate", "Discuss an important concept from Unit 4."),
+    ("E", 5, 2, 10, "long answer", "Analyze/Evaluate", "Explain an important concept from Unit 5 in detail.")
+]
+
+
+def question_paper_section_specs(unit_files):
+    return [
+        (section_name, unit_files[unit - 1], count, marks, style, bloom_label)
+        for section_name, unit, count, marks, style, bloom_label, _ in QUESTION_PAPER_SECTIONS
+    ]
+
+
+def build_question_paper_rows(section_results, total_cos, total_pos):
+    preview_rows = []
+
+    q_no = 1
+    idx_counter = 0
+    for section_name, _, count, marks, _, bloom_label, fallback in QUESTION_PAPER_SECTIONS:
+        section_questions = list(section_results.get(section_name, []))
+        while len(section_questions) < count:
+            section_questions.append(fallback)
+
+        for q in section_questions:
+            preview_rows.append({
+                "Section": section_name,
+                "Question No.": f"Q{q_no}",
+                "Question Statement": q,
+                "CO": assign_co(idx_counter, total_cos),
+                "PO": assign_po(idx_counter, total_pos),
+                "Bloom’s Level": bloom_label,
+                "Marks": str(marks)
+            })
+            q_no += 1
+            idx_counter += 1
+
+    return preview_rows
@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from bloomgen import trace
+from bloomgen.cache import CACHE_DIR
+
+# =========================
+# Job Settings
+# =========================
+JOB_WORKERS = int(os.getenv("BLOOMGEN_JOB_WORKERS", "4"))
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+
+ACTIVE_STATUSES = ("queued", "running")
+# A job that has not written progress or status for this long is treated as
+# lost by pollers, so a page never waits on it forever.
+JOB_STALL_SECONDS = int(os.getenv("BLOOMGEN_JOB_STALL_SECONDS", "900"))
+
+_log = logging.getLogger(__name__)
+
+# Every job records the process that runs it, so a restart only fails its own
+# dead predecessors' jobs and never those of other live processes sharing the file.
+HOSTNAME = socket.gethostname()
+
+
+# =========================
+# SQLite Job Store
+# =========================
+def _owner_alive(owner):
+    host, _, pid = owner.rpartition(":")
+    # Other hosts can't be probed, and on Windows os.kill would terminate the target;
+    # those jobs are left for follow_job's stall timeout.
+    if host != HOSTNAME or os.name == "nt":
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    def __init__(self, path, owner=None):
+        self.path = path
+        self.owner = owner or f"{HOSTNAME}:{os.getpid()}"
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+            "status TEXT NOT NULL, progress TEXT, result TEXT, error TEXT, "
+            "created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_fingerprint ON jobs(fingerprint, status)")
+        # Stores created before jobs had an owner.
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        if "owner" not in columns:
+            try:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            except sqlite3.OperationalError:
+                pass  # another process added it first
+
+    def recover(self):
+        # Jobs that were queued or running when their process died will never finish.
+        # Only jobs whose owner is gone are failed; unowned rows predate owners.
+        now = time.time()
+        with self._lock:
+            active = self._conn.execute(
+                "SELECT id, owner FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchall()
+            orphans = [(now, job_id) for job_id, owner in active if not owner or not _owner_alive(owner)]
+            self._conn.executemany(
+                "UPDATE jobs SET status = 'failed', error = 'Interrupted by a server restart', updated = ? "
+                "WHERE id = ?",
+                orphans
+            )
+            self._conn.execute("DELETE FROM jobs WHERE updated < ?", (now - JOB_RETENTION_SECONDS,))
+
+    def create(self, kind, fingerprint):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs(id, kind, fingerprint, owner, status, created, updated) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, fingerprint, self.owner, now, now)
+            )
+        return job_id
+
+    def find_active(self, fingerprint):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE fingerprint = ? AND status IN ('queued', 'running') "
+                "ORDER BY created DESC LIMIT 1",
+                (fingerprint,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def update(self, job_id, status=None, progress=None, result=None, error=None):
+        fields = {"updated": time.time()}
+        if status is not None:
+            fields["status"] = status
+        if progress is not None:
+            fields["progress"] = json.dumps(progress)
+        if result is not None:
+            fields["result"] = json.dumps(result)
+        if error is not None:
+            fields["error"] = error
+
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, status, progress, result, error, created, updated FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        return {
+            "id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "progress": json.loads(row[3]) if row[3] else None,
+            "result": json.loads(row[4]) if row[4] else None,
+            "error": row[5],
+            "created": row[6],
+            "updated": row[7]
+        }
+
+
+# =========================
+# Background Runner
+# =========================
+def _log_lost_job(future):
+    # Only reached when even marking the job failed raised (e.g. the store is gone);
+    # pollers give up on such a job after JOB_STALL_SECONDS.
+    exc = future.exception()
+    if exc is not None:
+        _log.error("Background job could not record its outcome", exc_info=exc)
+
+
+class JobRunner:
+    def __init__(self, store: JobStore, max_workers=JOB_WORKERS):
+        self.store = store
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bloomgen-job")
+        self._submit_lock = threading.Lock()
+
+    def submit(self, kind, fingerprint, fn):
+        # fn(report) does the work and returns a JSON-serialisable result; report(progress)
+        # stores a JSON-serialisable progress snapshot. An identical request that is
+        # already queued or running is joined instead of started again.
+        with self._submit_lock:
+            existing = self.store.find_active(fingerprint)
+            if existing:
+                return existing
+            job_id = self.store.create(kind, fingerprint)
+
+        future = self._pool.submit(self._run, job_id, kind, fn)
+        future.add_done_callback(_log_lost_job)
+        return job_id
+
+    def _run(self, job_id, kind, fn):
+        # Storing the result is inside the try too: a job must never stay
+        # "running" because its final update raised.
+        try:
+            self.store.update(job_id, status="running")
+            with trace.run(kind, job_id) as run:
+                result = fn(lambda progress: self.store.update(job_id, progress=progress))
+            # With tracing on, the per-stage breakdown travels with the result.
+            if run is not None and isinstance(result, dict):
+                result["profile"] = run.profile()
+            self.store.update(job_id, status="done", result=result)
+        except Exception as e:
+            self.store.update(job_id, status="failed", error=str(e) or type(e).__name__)
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            store = JobStore(os.path.join(CACHE_DIR, "jobs.sqlite3"))
+            store.recover()
+            _runner = JobRunner(store)
+        return _runner
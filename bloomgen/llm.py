@@ -0,0 +1,277 @@
+import email.utils
+import os
+import random
+import threading
+import time
+
+import groq
+
+from bloomgen import trace
+
+# =========================
+# Scheduler Settings
+# =========================
+LLM_MAX_CONCURRENCY = int(os.getenv("BLOOMGEN_LLM_CONCURRENCY", "4"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("BLOOMGEN_LLM_RPM", "30"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("BLOOMGEN_LLM_TPM", "0"))
+LLM_MAX_COMPLETION_TOKENS = 1200
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+# =========================
+# Error Classification
+# =========================
+def error_status_code(exc):
+    return getattr(exc, "status_code", None)
+
+
+def retry_after_seconds(exc):
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def is_retryable(exc) -> bool:
+    if isinstance(exc, groq.APIConnectionError):
+        return True
+    status = error_status_code(exc)
+    return status is not None and (status in (408, 409, 429) or status >= 500)
+
+
+def estimate_tokens(payload) -> int:
+    # ~4 characters per token is close enough for budgeting.
+    return sum(len(str(v)) for v in payload.values()) // 4 + LLM_MAX_COMPLETION_TOKENS
+
+
+# =========================
+# Token Bucket
+# =========================
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        if self.capacity <= 0:
+            return
+
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# =========================
+# Circuit Breaker
+# =========================
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, cooldown_seconds=30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.cooldown_seconds - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"LLM provider is failing; not sending requests for another {remaining:.1f}s"
+                )
+            # Cooldown over: let calls through. One more failure re-opens it at once
+            # because the failure count is only reset by a success.
+            self.opened_at = None
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self.opened_at is not None
+
+
+# =========================
+# LLM Scheduler
+# =========================
+class LLMScheduler:
+    def __init__(
+        self,
+        max_concurrency=LLM_MAX_CONCURRENCY,
+        requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+        max_retries=4,
+        base_delay=1.0,
+        max_delay=30.0,
+        breaker=None
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._counts = {"calls": 0, "retries": 0, "rate_limited": 0, "failures": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _pause(self, seconds):
+        # A Retry-After applies to every caller, not just the one that got it.
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _wait_if_paused(self):
+        with self._lock:
+            remaining = self._paused_until - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining + random.uniform(0, self.base_delay))
+
+    def _before_attempt(self, estimated_tokens):
+        self.breaker.before_call()
+        self._wait_if_paused()
+        self._requests.acquire(1)
+        self._tokens.acquire(estimated_tokens)
+        self._count("calls")
+
+    def _after_failure(self, exc, attempt):
+        # Re-raises when the error is not worth retrying; otherwise waits out the
+        # backoff so the caller can loop round for another attempt.
+        if not is_retryable(exc):
+            raise exc
+
+        if error_status_code(exc) == 429:
+            self._count("rate_limited")
+        else:
+            self._count("failures")
+            self.breaker.record_failure()
+
+        if attempt >= self.max_retries:
+            raise exc
+
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None:
+            self._pause(retry_after)
+        else:
+            # Full jitter keeps concurrent callers from retrying in lockstep.
+            time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt))))
+
+        self._count("retries")
+
+    def invoke(self, chain, payload, estimated_tokens=None):
+        estimated_tokens = estimated_tokens or estimate_tokens(payload)
+
+        with trace.llm_span(chain, estimated_tokens) as call:
+            attempt = 0
+            while True:
+                self._before_attempt(estimated_tokens)
+                try:
+                    with self._slots:
+                        result = chain.invoke(payload, call.config)
+                except Exception as e:
+                    self._after_failure(e, attempt)
+                    attempt += 1
+                    call.set(retries=attempt)
+                    continue
+
+                self.breaker.record_success()
+                return result
+
+    def stream(self, chain, payload, estimated_tokens=None):
+        estimated_tokens = estimated_tokens or estimate_tokens(payload)
+
+        with trace.llm_span(chain, estimated_tokens) as call:
+            attempt = 0
+            while True:
+                self._before_attempt(estimated_tokens)
+                started = False
+                try:
+                    with self._slots:
+                        for chunk in chain.stream(payload, call.config):
+                            started = True
+                            yield chunk
+                except Exception as e:
+                    # Once chunks have reached the caller a retry would duplicate them.
+                    if started:
+                        raise
+                    self._after_failure(e, attempt)
+                    attempt += 1
+                    call.set(retries=attempt)
+                    continue
+
+                self.breaker.record_success()
+                return
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+        counts["circuit_open"] = self.breaker.is_open
+        return counts
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+        return _scheduler
+
+
+def configure_scheduler(**settings) -> LLMScheduler:
+    # Replaces the shared scheduler, e.g. so a batch run can set its own concurrency.
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = LLMScheduler(**settings)
+        return _scheduler
@@ -0,0 +1,536 @@
+# Load testing: how many concurrent generations one server takes before the
+# job pool, the shared LLM scheduler and its backoff sleeps start to queue.
+#
+# A local HTTP server stands in for Groq's chat-completions endpoint (plain and
+# streamed replies from bloomgen.fake_llm) and injects latency, 429s with
+# Retry-After and 503s. ChatGroq is pointed at it through GROQ_API_BASE, so
+# every call still goes through the real client, HTTP pool and scheduler.
+# Simulated users then do what a browser session does: submit an assignment or
+# question paper job to a JobRunner, poll it until it finishes, and go again.
+#
+#   python -m bloomgen.loadtest run --users 1 4 8 16 --iterations 2 --latency 0.8 --error-429 0.05
+#   python -m bloomgen.loadtest serve --port 8089 --latency 1.0 --error-503 0.02
+#
+# serve runs only the fake provider, e.g. to point a real deployment at it with
+# GROQ_API_BASE=http://127.0.0.1:8089. The scheduler and job pool keep their
+# deployed settings (BLOOMGEN_LLM_RPM, BLOOMGEN_LLM_CONCURRENCY,
+# BLOOMGEN_JOB_WORKERS) unless overridden, since those are what is being tested.
+import argparse
+import collections
+import datetime
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import docx
+import numpy as np
+
+# Only modules that never touch the caches are imported here; the rest are
+# imported once main() has moved the caches to a scratch directory.
+from bloomgen.bench import git_commit, scratch_cache_dir, syllabus_text
+from bloomgen.fake_llm import fake_reply
+
+REPORT_VERSION = 1
+PERCENTILES = [50, 90, 95, 99]
+STREAM_CHUNK_CHARS = 24
+# How often a simulated user polls its job; the app's follow_job polls every 0.5s.
+POLL_SECONDS = 0.5
+
+ASSIGNMENT_FIELDS = {
+    "{{SUBJECT}}": "Operating Systems", "{{DEPARTMENT}}": "CSE", "{{SEMESTER}}": "VIII",
+    "{{ACADEMIC_YEAR}}": "2025-26", "{{TEACHER_NAME}}": "Load Test"
+}
+QUESTION_PAPER_FIELDS = {
+    "department": "CSE", "semester": "VIII", "academic_year": "2025-26", "course_name": "Operating Systems",
+    "course_code": "CS801", "subject_teacher": "Load Test", "duration": "2 Hours", "total_marks": "48"
+}
+
+
+# =========================
+# Fake Groq Provider
+# =========================
+class FakeGroqServer:
+    # Answers POST /openai/v1/chat/completions the way Groq does. Each request
+    # waits latency (+ uniform jitter) seconds, then fails with 429 or 503 at the
+    # given rates. requests_per_minute > 0 adds a real sliding-window quota on
+    # top, answered with 429 and the Retry-After until a slot frees up.
+    def __init__(
+        self, host="127.0.0.1", port=0, latency=0.5, jitter=0.0,
+        error_429_rate=0.0, error_503_rate=0.0, retry_after=1.0, requests_per_minute=0, seed=0
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_429_rate = error_429_rate
+        self.error_503_rate = error_503_rate
+        self.retry_after = retry_after
+        self.requests_per_minute = requests_per_minute
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = collections.deque()
+        self._counts = collections.Counter()
+
+        self._httpd = ThreadingHTTPServer((host, port), _ChatCompletionsHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.provider = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-groq", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def decide(self):
+        # Returns (delay, status, retry_after) for the next request.
+        with self._lock:
+            self._counts["requests"] += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+
+            if self.requests_per_minute > 0:
+                now = time.monotonic()
+                while self._window and now - self._window[0] >= 60:
+                    self._window.popleft()
+                if len(self._window) >= self.requests_per_minute:
+                    self._counts["429_quota"] += 1
+                    return 0.0, 429, max(0.1, 60 - (now - self._window[0]))
+                self._window.append(now)
+
+            draw = self._rng.random()
+            if draw < self.error_429_rate:
+                self._counts["429"] += 1
+                return delay, 429, self.retry_after
+            if draw < self.error_429_rate + self.error_503_rate:
+                self._counts["503"] += 1
+                return delay, 503, None
+            self._counts["ok"] += 1
+            return delay, 200, None
+
+    def count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+
+class _ChatCompletionsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=()):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        provider = self.server.provider
+        delay, status, retry_after = provider.decide()
+        if delay:
+            time.sleep(delay)
+
+        if status == 429:
+            self.send_json(429, {"error": {
+                "message": "Rate limit reached for model. Please try again later.",
+                "type": "tokens", "code": "rate_limit_exceeded"
+            }}, [("Retry-After", f"{retry_after:.2f}")])
+            return
+        if status == 503:
+            self.send_json(503, {"error": {"message": "Service Unavailable", "type": "internal_server_error"}})
+            return
+
+        messages = request.get("messages") or [{}]
+        prompt = messages[-1].get("content") or ""
+        reply = fake_reply(prompt)
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(reply) // 4,
+            "total_tokens": (len(prompt) + len(reply)) // 4
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = request.get("model")
+        if model is None:
+            from bloomgen.generation import LLM_MODEL_NAME
+            model = LLM_MODEL_NAME
+
+        if not request.get("stream"):
+            self.send_json(200, {
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{
+                    "index": 0, "message": {"role": "assistant", "content": reply},
+                    "logprobs": None, "finish_reason": "stop"
+                }],
+                "usage": usage
+            })
+            return
+
+        provider.count("streams")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta, finish_reason=None, **extra):
+            chunk = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish_reason}],
+                **extra
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+        event({"role": "assistant", "content": ""})
+        for start in range(0, len(reply), STREAM_CHUNK_CHARS):
+            event({"content": reply[start:start + STREAM_CHUNK_CHARS]})
+        event({}, "stop", x_groq={"id": completion_id, "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+# =========================
+# Simulated Users
+# =========================
+def text_docx(text) -> bytes:
+    doc = docx.Document()
+    for line in text.split("\n"):
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def write_file(work_dir, name, data):
+    path = os.path.join(work_dir, name)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def assignment_job(syllabus_path, question_count, use_bank):
+    # The app's run_assignment_job with fixed form values.
+    row_settings = (6, 12, 3, 5, 7)
+
+    def run(report):
+        from bloomgen.cache import get_artifact_store
+        from bloomgen.classify import bloom_mismatches
+        from bloomgen.docx_render import generate_university_docx
+        from bloomgen.extract import extract_text
+        from bloomgen.generation import assignment_row, generate_questions
+        from bloomgen.pdf_render import generate_assignment_pdf
+
+        done = {}
+
+        def on_question(q, bloom):
+            done[bloom] = done.get(bloom, 0) + 1
+            report({"done": done})
+
+        pairs = generate_questions(
+            "Operating Systems", extract_text(syllabus_path), question_count, 30, 30, 40,
+            on_question=on_question, use_bank=use_bank
+        )
+        rows = [assignment_row(i, q, b, *row_settings) for i, (q, b) in enumerate(pairs, start=1)]
+        bloom_mismatches(rows)
+        docx_bytes = generate_university_docx(
+            ASSIGNMENT_FIELDS, [q for q, _ in pairs], [b for _, b in pairs], *row_settings
+        )
+        pdf_bytes = generate_assignment_pdf(ASSIGNMENT_FIELDS, rows)
+        store = get_artifact_store()
+        return {"questions": len(pairs), "files": [store.put(docx_bytes), store.put(pdf_bytes)]}
+    return run
+
+
+def question_paper_job(unit_paths, use_bank):
+    # The app's run_question_paper_job with fixed form values.
+    def run(report):
+        from bloomgen.cache import get_artifact_store
+        from bloomgen.classify import bloom_mismatches
+        from bloomgen.docx_render import generate_question_paper_docx
+        from bloomgen.generation import build_question_paper_rows, generate_paper_sections, question_paper_section_specs
+        from bloomgen.pdf_render import generate_question_paper_pdf
+
+        done = {}
+
+        def on_question(section_name, q):
+            done[section_name] = done.get(section_name, 0) + 1
+            report({"done": done})
+
+        results, errors = generate_paper_sections(
+            "Operating Systems", question_paper_section_specs(unit_paths), on_question=on_question, use_bank=use_bank
+        )
+        if errors:
+            return {"errors": errors}
+
+        rows = build_question_paper_rows(results, 6, 12)
+        bloom_mismatches(rows)
+        store = get_artifact_store()
+        docx_bytes = generate_question_paper_docx(QUESTION_PAPER_FIELDS, rows)
+        pdf_bytes = generate_question_paper_pdf(QUESTION_PAPER_FIELDS, rows)
+        return {"questions": len(rows), "files": [store.put(docx_bytes), store.put(pdf_bytes)]}
+    return run
+
+
+def simulate_user(user, runner, args, work_dir, level_salt):
+    from bloomgen.cache import content_hash
+    from bloomgen.jobs import ACTIVE_STATUSES
+
+    # Closed loop: submit, poll until the job ends, think, repeat.
+    records = []
+    kinds = ["assignment", "question_paper"] if args.mix == "both" else [args.mix]
+    for iteration in range(args.iterations):
+        kind = kinds[(user + iteration) % len(kinds)]
+        # Fresh syllabus text every job, so nothing is served from the summary cache.
+        salt = level_salt + user * 1000 + iteration * 10
+        if kind == "assignment":
+            path = write_file(work_dir, f"syllabus_{salt}.docx", text_docx(syllabus_text(salt)))
+            fn = assignment_job(path, args.questions, args.bank)
+        else:
+            paths = [
+                write_file(work_dir, f"unit_{salt + unit}.docx", text_docx(syllabus_text(salt + unit, units=1)))
+                for unit in range(5)
+            ]
+            fn = question_paper_job(paths, args.bank)
+
+        started = time.perf_counter()
+        job_id = runner.submit(kind, content_hash(kind, salt, uuid.uuid4().hex), fn)
+        while True:
+            job = runner.get(job_id)
+            if job is None or job["status"] not in ACTIVE_STATUSES:
+                break
+            time.sleep(args.poll)
+        seconds = time.perf_counter() - started
+
+        error = None
+        if job is None:
+            error = "job disappeared"
+        elif job["status"] == "failed":
+            error = job["error"]
+        elif (job["result"] or {}).get("errors"):
+            error = "; ".join(f"section {s}: {e}" for s, e in sorted(job["result"]["errors"].items()))
+        records.append({"user": user, "kind": kind, "seconds": seconds, "ok": error is None, "error": error})
+
+        if args.think:
+            time.sleep(args.think)
+    return records
+
+
+# =========================
+# Load Levels
+# =========================
+def percentiles_ms(seconds):
+    if not seconds:
+        return {f"p{p}_ms": None for p in PERCENTILES} | {"max_ms": None}
+    values = np.array(seconds)
+    return {
+        **{f"p{p}_ms": round(float(np.percentile(values, p)) * 1000, 1) for p in PERCENTILES},
+        "max_ms": round(float(values.max()) * 1000, 1)
+    }
+
+
+def counter_delta(after, before):
+    return {k: v - before.get(k, 0) for k, v in after.items() if isinstance(v, (int, float)) and not isinstance(v, bool)}
+
+
+def run_level(users, runner, provider, args, work_dir, level_salt):
+    from bloomgen.llm import configure_scheduler
+
+    # A fresh scheduler per level, so a pause or open breaker does not leak into the next one.
+    scheduler = configure_scheduler(
+        max_concurrency=args.llm_concurrency, requests_per_minute=args.rpm, tokens_per_minute=args.tpm
+    )
+    provider_before = provider.stats()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users, thread_name_prefix="bloomgen-user") as pool:
+        futures = [pool.submit(simulate_user, u, runner, args, work_dir, level_salt) for u in range(users)]
+        records = [r for f in futures for r in f.result()]
+    wall = time.perf_counter() - started
+
+    completed = [r for r in records if r["ok"]]
+    errors = collections.Counter((r["error"] or "")[:160] for r in records if not r["ok"])
+    by_kind = {}
+    for kind in sorted({r["kind"] for r in records}):
+        kind_records = [r for r in records if r["kind"] == kind]
+        by_kind[kind] = {
+            "jobs": len(kind_records),
+            "failed": sum(1 for r in kind_records if not r["ok"]),
+            **percentiles_ms([r["seconds"] for r in kind_records if r["ok"]])
+        }
+
+    provider_counts = counter_delta(provider.stats(), provider_before)
+    level = {
+        "users": users,
+        "jobs": len(records),
+        "completed": len(completed),
+        "failed": len(records) - len(completed),
+        "error_rate": round((len(records) - len(completed)) / max(1, len(records)), 4),
+        "wall_seconds": round(wall, 2),
+        "throughput_per_min": round(len(completed) / wall * 60, 2),
+        **percentiles_ms([r["seconds"] for r in completed]),
+        "by_kind": by_kind,
+        "provider": provider_counts,
+        "scheduler": counter_delta(scheduler.stats(), {}),
+        "errors": dict(errors.most_common(5))
+    }
+    print(
+        f"{users:>6} {level['jobs']:>6} {level['error_rate']:>7.1%} {level['throughput_per_min']:>9.1f} "
+        f"{fmt_ms(level['p50_ms'])} {fmt_ms(level['p95_ms'])} {fmt_ms(level['p99_ms'])} "
+        f"{provider_counts.get('requests', 0):>8} {scheduler.stats()['retries']:>8}",
+        flush=True
+    )
+    return level
+
+
+def fmt_ms(value):
+    return f"{value / 1000:>8.1f}s" if value is not None else f"{'-':>9}"
+
+
+def run_load_test(args):
+    from bloomgen.cache import CACHE_DIR
+    from bloomgen.jobs import JOB_WORKERS, JobRunner, JobStore
+    from bloomgen.llm import LLM_MAX_CONCURRENCY, LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE
+
+    for name, default in (
+        ("job_workers", JOB_WORKERS), ("llm_concurrency", LLM_MAX_CONCURRENCY),
+        ("rpm", LLM_REQUESTS_PER_MINUTE), ("tpm", LLM_TOKENS_PER_MINUTE)
+    ):
+        if getattr(args, name) is None:
+            setattr(args, name, default)
+
+    provider = FakeGroqServer(
+        latency=args.latency, jitter=args.jitter, error_429_rate=args.error_429, error_503_rate=args.error_503,
+        retry_after=args.retry_after, requests_per_minute=args.provider_rpm, seed=args.seed
+    ).start()
+    # Read by ChatGroq when the process-wide client is first built.
+    os.environ["GROQ_API_BASE"] = provider.url
+    os.environ.setdefault("GROQ_API_KEY", "loadtest")
+
+    runner = JobRunner(JobStore(os.path.join(CACHE_DIR, "jobs.sqlite3")), max_workers=args.job_workers)
+    print(f"fake provider {provider.url}; job workers {args.job_workers}, LLM concurrency "
+          f"{args.llm_concurrency}, {args.rpm or 'unlimited'} RPM")
+    print(f"{'users':>6} {'jobs':>6} {'errors':>7} {'jobs/min':>9} {'p50':>9} {'p95':>9} {'p99':>9} "
+          f"{'requests':>8} {'retries':>8}")
+
+    started = time.time()
+    levels = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="bloomgen-loadtest-") as work_dir:
+            for i, users in enumerate(args.users):
+                levels.append(run_level(users, runner, provider, args, work_dir, (i + 1) * 1_000_000))
+    finally:
+        provider.stop()
+
+    return {
+        "version": REPORT_VERSION,
+        "commit": git_commit(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "seconds": round(time.time() - started, 1),
+        "settings": {
+            key: getattr(args, key) for key in (
+                "iterations", "mix", "questions", "bank", "think", "poll", "latency", "jitter", "error_429",
+                "error_503", "retry_after", "provider_rpm", "job_workers", "llm_concurrency", "rpm", "tpm"
+            )
+        },
+        "levels": levels
+    }
+
+
+# =========================
+# Command Line
+# =========================
+def add_provider_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0.8, help="provider latency per call in seconds")
+    parser.add_argument("--jitter", type=float, default=0.4, help="extra uniform latency, 0..jitter seconds")
+    parser.add_argument("--error-429", type=float, default=0.0, help="fraction of calls answered 429")
+    parser.add_argument("--error-503", type=float, default=0.0, help="fraction of calls answered 503")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with a 429")
+    parser.add_argument("--provider-rpm", type=int, default=0, help="provider-side request quota, 0 = none")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bloomgen.loadtest", description="BloomGen load testing.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = commands.add_parser("run", help="drive simulated users against a fake provider")
+    run_cmd.add_argument("--users", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="concurrency levels")
+    run_cmd.add_argument("--iterations", type=int, default=2, help="jobs per user per level")
+    run_cmd.add_argument("--mix", choices=["both", "assignment", "question_paper"], default="both")
+    run_cmd.add_argument("--questions", type=int, default=10, help="questions per assignment")
+    run_cmd.add_argument("--bank", action="store_true", help="let jobs draw on the question bank")
+    run_cmd.add_argument("--think", type=float, default=0.0, help="seconds a user waits between jobs")
+    run_cmd.add_argument("--poll", type=float, default=POLL_SECONDS, help="job polling interval in seconds")
+    # Unset, these four keep the deployed BLOOMGEN_* settings.
+    run_cmd.add_argument("--job-workers", type=int)
+    run_cmd.add_argument("--llm-concurrency", type=int)
+    run_cmd.add_argument("--rpm", type=int, help="scheduler requests per minute")
+    run_cmd.add_argument("--tpm", type=int, help="scheduler tokens per minute")
+    run_cmd.add_argument("--output", help="JSON report path")
+    add_provider_arguments(run_cmd)
+
+    serve_cmd = commands.add_parser("serve", help="run only the fake Groq provider")
+    serve_cmd.add_argument("--host", default="127.0.0.1")
+    serve_cmd.add_argument("--port", type=int, default=8089)
+    add_provider_arguments(serve_cmd)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        provider = FakeGroqServer(
+            args.host, args.port, args.latency, args.jitter, args.error_429, args.error_503,
+            args.retry_after, args.provider_rpm, args.seed
+        )
+        print(f"fake Groq provider on {provider.url} (set GROQ_API_BASE to this)")
+        try:
+            provider.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        print(json.dumps(provider.stats()))
+        return 0
+
+    # Caches and the job store live in a scratch directory for the run, so a load
+    # test never reads from or writes to the real ones.
+    with scratch_cache_dir("bloomgen-loadtest-"):
+        report = run_load_test(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"report -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+import functools
+import io
+import os
+from xml.sax.saxutils import escape
+
+from PIL import Image
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import KeepTogether, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from bloomgen import trace
+from bloomgen.docx_render import BASE_DIR, DOC_FONT_NAME, DOC_FONT_SIZE_PT
+from bloomgen.generation import QUESTION_PAPER_SECTIONS
+
+# =========================
+# PDF Layout Settings
+# =========================
+PDF_MIME = "application/pdf"
+PDF_FONT_DIR = os.getenv("BLOOMGEN_PDF_FONT_DIR", "")
+LOGO_PATH = os.path.join(BASE_DIR, "assets", "logo.png")
+LOGO_SIZE = 44
+LOGO_PIXELS = 176
+
+INSTITUTION = "Pimpri Chinchwad Education Trust’s Pimpri Chinchwad University Sate Maval, Pune"
+PAGE_WIDTH, PAGE_HEIGHT = A4
+PAGE_MARGIN = 36
+HEADER_HEIGHT = 64
+
+# Question No., Question Statement, CO, PO, Bloom's Level, Marks; sums to the frame width.
+QUESTION_COLUMN_WIDTHS = [56, 247, 45, 45, 80, 50]
+QUESTION_COLUMNS = ["Question No.", "Question Statement", "CO", "PO", "Bloom’s Level", "Marks"]
+
+# Document fonts from the sidebar, mapped onto PDF base fonts when no TTF is available.
+BASE_FONTS = {
+    "Calibri": ("Helvetica", "Helvetica-Bold"),
+    "Arial": ("Helvetica", "Helvetica-Bold"),
+    "Times New Roman": ("Times-Roman", "Times-Bold")
+}
+
+
+# =========================
+# Cached Fonts, Styles and Page Templates
+# =========================
+@functools.lru_cache(maxsize=None)
+def pdf_fonts(font_name):
+    # Parsing a TTF is the slowest part of a small render, so each face is registered once per process.
+    regular_path = os.path.join(PDF_FONT_DIR, f"{font_name}.ttf")
+    bold_path = os.path.join(PDF_FONT_DIR, f"{font_name} Bold.ttf")
+    if PDF_FONT_DIR and os.path.exists(regular_path):
+        pdfmetrics.registerFont(TTFont(font_name, regular_path))
+        bold_name = font_name
+        if os.path.exists(bold_path):
+            bold_name = f"{font_name}-Bold"
+            pdfmetrics.registerFont(TTFont(bold_name, bold_path))
+        return font_name, bold_name
+    return BASE_FONTS.get(font_name, BASE_FONTS[DOC_FONT_NAME])
+
+
+@functools.lru_cache(maxsize=None)
+def pdf_styles(font_name, font_size_pt):
+    regular, bold = pdf_fonts(font_name)
+    leading = font_size_pt * 1.2
+    return {
+        "cell": ParagraphStyle("cell", fontName=regular, fontSize=font_size_pt, leading=leading),
+        "cell_center": ParagraphStyle(
+            "cell_center", fontName=regular, fontSize=font_size_pt, leading=leading, alignment=TA_CENTER
+        ),
+        "head": ParagraphStyle(
+            "head", fontName=bold, fontSize=font_size_pt, leading=leading, alignment=TA_CENTER
+        ),
+        "section": ParagraphStyle(
+            "section", fontName=bold, fontSize=font_size_pt + 1, leading=leading + 1, spaceBefore=8, spaceAfter=4
+        )
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def pdf_logo():
+    # The source logo is 2000px square; every PDF would re-compress it. Downscale once
+    # to what a 44pt slot needs at print resolution.
+    if not os.path.exists(LOGO_PATH):
+        return None
+    with Image.open(LOGO_PATH) as image:
+        logo = image.convert("RGBA")
+    logo.thumbnail((LOGO_PIXELS, LOGO_PIXELS))
+    return ImageReader(logo)
+
+
+@functools.lru_cache(maxsize=None)
+def page_template(title, font_name):
+    # Every position and string on the page band is worked out here once per title and font;
+    # the returned callback only replays the drawing calls on each page.
+    regular, bold = pdf_fonts(font_name)
+    logo = pdf_logo()
+    top = PAGE_HEIGHT - PAGE_MARGIN
+    left = PAGE_MARGIN
+    right = PAGE_WIDTH - PAGE_MARGIN
+    center = PAGE_WIDTH / 2
+
+    def draw(canvas, doc):
+        canvas.saveState()
+        if logo is not None:
+            canvas.drawImage(
+                logo, left, top - LOGO_SIZE, width=LOGO_SIZE, height=LOGO_SIZE, preserveAspectRatio=True, mask="auto"
+            )
+        canvas.setFont(bold, 10)
+        canvas.drawCentredString(center, top - 14, INSTITUTION)
+        canvas.setFont(bold, 12)
+        canvas.drawCentredString(center, top - 32, title)
+        canvas.setFont(regular, 8)
+        canvas.drawRightString(right, top - 46, "Record No.: ACAD/R/18")
+        canvas.line(left, top - HEADER_HEIGHT + 10, right, top - HEADER_HEIGHT + 10)
+        canvas.drawCentredString(center, PAGE_MARGIN / 2, f"Page {doc.page}")
+        canvas.restoreState()
+
+    return draw
+
+
+GRID_STYLE = TableStyle([
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("TOPPADDING", (0, 0), (-1, -1), 3),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 3)
+])
+
+QUESTION_TABLE_STYLE = TableStyle(GRID_STYLE.getCommands() + [
+    ("SPAN", (0, 0), (0, 1)),
+    ("SPAN", (1, 0), (1, 1)),
+    ("SPAN", (2, 0), (3, 0)),
+    ("SPAN", (4, 0), (4, 1)),
+    ("SPAN", (5, 0), (5, 1)),
+    ("BACKGROUND", (0, 0), (-1, 1), colors.HexColor("#EDEDED"))
+])
+
+
+# =========================
+# Flowable Builders
+# =========================
+def cell(text, style):
+    return Paragraph(escape(str(text)), style)
+
+
+def metadata_table(pairs, styles):
+    # Two label/value pairs per line, like the DOCX meta table.
+    cells = [cell(f"{label}: {value}", styles["cell"]) for label, value in pairs]
+    if len(cells) % 2:
+        cells.append("")
+    rows = [cells[i:i + 2] for i in range(0, len(cells), 2)]
+    frame_width = PAGE_WIDTH - 2 * PAGE_MARGIN
+    return Table(rows, colWidths=[frame_width / 2] * 2, style=GRID_STYLE)
+
+
+def question_table(rows, styles):
+    head = styles["head"]
+    data = [
+        [cell("Question No.", head), cell("Question Statement", head), cell("Level of mapping and Number", head),
+         "", cell("Bloom’s Level", head), cell("Marks", head)],
+        ["", "", cell("CO", head), cell("PO", head), "", ""]
+    ]
+    for row in rows:
+        data.append([
+            cell(row[column], styles["cell"] if column == "Question Statement" else styles["cell_center"])
+            for column in QUESTION_COLUMNS
+        ])
+    return Table(data, colWidths=QUESTION_COLUMN_WIDTHS, repeatRows=2, style=QUESTION_TABLE_STYLE)
+
+
+def signature_table(names, styles):
+    labels = ["Subject Incharge", "Academic Coordinator", "HOD"]
+    frame_width = PAGE_WIDTH - 2 * PAGE_MARGIN
+    return Table(
+        [[cell(name, styles["head"]) for name in names], [cell(label, styles["cell_center"]) for label in labels]],
+        colWidths=[frame_width / 3] * 3,
+        style=GRID_STYLE
+    )
+
+
+def build_pdf(title, story, font_name):
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=PAGE_MARGIN,
+        rightMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN + HEADER_HEIGHT,
+        bottomMargin=PAGE_MARGIN,
+        title=title
+    )
+    draw_page = page_template(title, font_name)
+    doc.build(story, onFirstPage=draw_page, onLaterPages=draw_page)
+    return buffer.getvalue()
+
+
+# =========================
+# Assignment PDF Generator
+# =========================
+@trace.stage("render")
+def generate_assignment_pdf(data_dict, rows, font_name=DOC_FONT_NAME, font_size_pt=DOC_FONT_SIZE_PT):
+    # data_dict is the same {{PLACEHOLDER}} mapping the DOCX generator fills in.
+    styles = pdf_styles(font_name, font_size_pt)
+
+    def value(key):
+        return data_dict.get("{{" + key + "}}", "")
+
+    story = [
+        metadata_table([
+            ("Department", value("DEPARTMENT")),
+            ("Semester", value("SEMESTER")),
+            ("Academic Year", value("ACADEMIC_YEAR")),
+            ("Year and Div.", value("YEAR_DIV")),
+            ("Subject", value("SUBJECT")),
+            ("Maximum Marks", value("MAX_MARKS")),
+            ("Subject Teacher", value("TEACHER_NAME")),
+            ("Assignment No", value("ASSIGNMENT_NO")),
+            ("Date", value("DATE")),
+            ("Date of Submission", value("SUBMISSION_DATE"))
+        ], styles),
+        Spacer(1, 10),
+        question_table(rows, styles),
+        Spacer(1, 24),
+        signature_table([value("SUBJECT_INCHARGE"), value("ACADEMIC_COORDINATOR"), value("HOD_NAME")], styles)
+    ]
+    return build_pdf("Assignment Sheet", story, font_name)
+
+
+# =========================
+# Question Paper PDF Generator
+# =========================
+@trace.stage("render")
+def generate_question_paper_pdf(data_dict, all_rows, font_name=DOC_FONT_NAME, font_size_pt=DOC_FONT_SIZE_PT):
+    styles = pdf_styles(font_name, font_size_pt)
+
+    story = [
+        metadata_table([
+            ("Department", data_dict.get("department", "")),
+            ("Semester", data_dict.get("semester", "")),
+            ("Academic Year", data_dict.get("academic_year", "")),
+            ("Maximum Marks", data_dict.get("total_marks", "")),
+            ("Course Name", data_dict.get("course_name", "")),
+            ("Course Code", data_dict.get("course_code", "")),
+            ("Subject Teacher", data_dict.get("subject_teacher", "")),
+            ("Duration", data_dict.get("duration", "")),
+            ("Date", data_dict.get("date", "")),
+            ("Date of Examination", data_dict.get("exam_date", ""))
+        ], styles)
+    ]
+
+    for section_name, unit, *_ in QUESTION_PAPER_SECTIONS:
+        section_rows = [row for row in all_rows if row["Section"] == section_name]
+        if not section_rows:
+            continue
+        heading = cell(f"SECTION {section_name} – Unit {unit} [Solve Any Two]", styles["section"])
+        story.append(KeepTogether([heading, question_table(section_rows, styles)]))
+
+    story += [
+        Spacer(1, 24),
+        signature_table([
+            data_dict.get("subject_incharge", ""),
+            data_dict.get("academic_coordinator", ""),
+            data_dict.get("hod_name", "")
+        ], styles)
+    ]
+    return build_pdf("Examination Question Paper", story, font_name)
@@ -0,0 +1,118 @@
+# Lexical context selection: BM25 over every chunk of a syllabus or unit, so
+# each Bloom bucket or paper section is prompted with the chunks most relevant
+# to it, within a token budget, instead of whatever the first few chunks are.
+import functools
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+from bloomgen.bank import STOPWORDS
+
+# =========================
+# Retrieval Settings
+# =========================
+# Raw chunk tokens selected per assignment generation, shared by the active Bloom
+# buckets, and per question paper section. The defaults match the old fixed
+# chunks[:6] / chunks[:2] cut-offs, so prompts never grow past what they were.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("BLOOMGEN_CONTEXT_TOKENS", "3600"))
+SECTION_CONTEXT_TOKEN_BUDGET = int(os.getenv("BLOOMGEN_SECTION_CONTEXT_TOKENS", "1100"))
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+SALIENT_TERMS = 12
+
+# Words that tend to surround material suited to each Bloom bucket.
+BLOOM_QUERY_TERMS = {
+    "Understand": "concept definition introduction overview architecture structure component type feature principle",
+    "Apply": "algorithm example procedure step implementation method problem calculation program technique",
+    "Analyze/Evaluate": "comparison advantage disadvantage limitation performance tradeoff issue analysis versus efficiency"
+}
+
+
+def chunk_tokens(text):
+    # ~4 characters per token, the same estimate the scheduler budgets with.
+    return max(1, len(text) // 4)
+
+
+def index_terms(text):
+    words = re.findall(r"[a-z][a-z0-9]{2,}", (text or "").lower())
+    return [w.rstrip("s") if len(w) > 4 else w for w in words if w not in STOPWORDS]
+
+
+# =========================
+# BM25 Chunk Index
+# =========================
+class ChunkIndex:
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        counts = [Counter(index_terms(c)) for c in self.chunks]
+        self.vocabulary = {t: i for i, t in enumerate(sorted(set().union(*counts)))}
+
+        # Dense chunk x term frequencies: a syllabus has tens of chunks, not thousands.
+        self.tf = np.zeros((len(self.chunks), len(self.vocabulary)), dtype=np.float32)
+        for row, counter in enumerate(counts):
+            self.tf[row, [self.vocabulary[t] for t in counter]] = list(counter.values())
+
+        lengths = self.tf.sum(axis=1)
+        df = (self.tf > 0).sum(axis=0)
+        n = len(self.chunks)
+        self.idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+        self.norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0)) if n else lengths
+        self.tokens = np.array([chunk_tokens(c) for c in self.chunks])
+
+        # The document's own most frequent terms, so every query leans towards its core topics.
+        totals = self.tf.sum(axis=0)
+        terms = sorted(self.vocabulary, key=lambda t: -totals[self.vocabulary[t]])
+        self.salient = terms[:SALIENT_TERMS]
+
+    def scores(self, query_terms):
+        columns = [self.vocabulary[t] for t in set(query_terms) if t in self.vocabulary]
+        if not columns:
+            return np.zeros(len(self.chunks))
+        tf = self.tf[:, columns]
+        return (self.idf[columns] * tf * (BM25_K1 + 1) / (tf + self.norm[:, None])).sum(axis=1)
+
+    def bloom_scores(self, bucket):
+        return self.scores(index_terms(BLOOM_QUERY_TERMS.get(bucket, "")) + self.salient)
+
+    def select(self, bucket, token_budget):
+        return self.select_many([bucket], token_budget)[bucket]
+
+    def select_many(self, buckets, token_budget):
+        # Buckets take turns picking their best remaining chunk within an equal
+        # share of the budget, so together they spread over the whole syllabus.
+        # A bucket only repeats a chunk another bucket took once nothing new fits.
+        share = token_budget // max(1, len(buckets))
+        ranked = {b: list(np.argsort(-self.bloom_scores(b), kind="stable")) for b in buckets}
+        selected = {b: [] for b in buckets}
+        spent = dict.fromkeys(buckets, 0)
+        taken = set()
+
+        progress = True
+        while progress:
+            progress = False
+            for bucket in buckets:
+                fits = [
+                    i for i in ranked[bucket]
+                    if i not in selected[bucket]
+                    and (not selected[bucket] or spent[bucket] + self.tokens[i] <= share)
+                ]
+                fresh = [i for i in fits if i not in taken]
+                if not (fresh or fits):
+                    continue
+                pick = int((fresh or fits)[0])
+                selected[bucket].append(pick)
+                spent[bucket] += self.tokens[pick]
+                taken.add(pick)
+                progress = True
+
+        return {b: sorted(chunks) for b, chunks in selected.items()}
+
+
+@functools.lru_cache(maxsize=32)
+def chunk_index(chunks: tuple) -> ChunkIndex:
+    # Keyed on the chunk texts themselves: a top-up round or a rerun on the same
+    # syllabus reuses the index instead of re-tokenizing.
+    return ChunkIndex(chunks)
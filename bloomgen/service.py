@@ -0,0 +1,283 @@
+# Async HTTP API over the same generation core as the Streamlit app.
+#
+#   uvicorn bloomgen.service:app --host 0.0.0.0 --port 8000
+#
+# LLM round trips run on a generation thread pool, where they share the process-wide
+# scheduler and pooled Groq client. Parsing and DOCX rendering run on a separate
+# render pool, so neither ever blocks the event loop. Rendered documents live in
+# the shared artifact store and are addressed by content hash.
+import asyncio
+import datetime
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, List
+from urllib.parse import urlencode
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+# Load .env before importing bloomgen, which reads its BLOOMGEN_* settings at import.
+load_dotenv()
+
+from bloomgen import trace  # noqa: E402
+from bloomgen.cache import get_artifact_store  # noqa: E402
+from bloomgen.classify import bloom_mismatches, mismatch_warning, relabel_pairs  # noqa: E402
+from bloomgen.docx_render import (  # noqa: E402
+    DOCX_MIME,
+    assignment_file_name,
+    generate_question_paper_docx,
+    generate_university_docx,
+    question_paper_file_name
+)
+from bloomgen.extract import extract_text  # noqa: E402
+from bloomgen.generation import (  # noqa: E402
+    assignment_row,
+    build_question_paper_rows,
+    generate_paper_sections,
+    generate_questions,
+    get_llm,
+    normalize_bloom_percentages,
+    question_paper_section_specs
+)
+
+SERVICE_GENERATION_WORKERS = int(os.getenv("BLOOMGEN_SERVICE_WORKERS", "16"))
+
+generation_pool = ThreadPoolExecutor(max_workers=SERVICE_GENERATION_WORKERS, thread_name_prefix="bloomgen-gen")
+render_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix="bloomgen-render")
+
+
+class UploadedBytes:
+    # Matches the .name/.getvalue() shape of Streamlit uploads that extract_text expects.
+    def __init__(self, name, data):
+        self.name = name
+        self._data = data
+
+    def getvalue(self):
+        return self._data
+
+
+class GenerationResponse(BaseModel):
+    rows: List[Dict[str, str]]
+    document_id: str
+    download_url: str
+    warnings: List[str] = []
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    # Build the pooled client before the first request rather than during it.
+    get_llm()
+    yield
+    generation_pool.shutdown(wait=False, cancel_futures=True)
+    render_pool.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(
+    title="BloomGen",
+    description="Bloom's Taxonomy aligned assignment and question paper generation",
+    lifespan=lifespan
+)
+
+
+@app.middleware("http")
+async def trace_requests(request, call_next):
+    # One trace run per request; endpoints and the pools they hand work to record into it.
+    with trace.run(request.url.path):
+        return await call_next(request)
+
+
+async def run_in(pool, fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(pool, trace.bind(fn), *args)
+
+
+async def read_upload(upload: UploadFile) -> UploadedBytes:
+    if not upload.filename or not upload.filename.lower().endswith((".pdf", ".docx")):
+        raise HTTPException(status_code=415, detail=f"{upload.filename or 'upload'} must be a PDF or DOCX file")
+    return UploadedBytes(upload.filename, await upload.read())
+
+
+async def store_document(docx_bytes):
+    return await run_in(render_pool, get_artifact_store().put, docx_bytes)
+
+
+def generation_response(rows, document_id, file_name, warnings=()):
+    download_url = app.url_path_for("download_document", document_id=document_id)
+    return GenerationResponse(
+        rows=rows,
+        document_id=document_id,
+        download_url=f"{download_url}?{urlencode({'filename': file_name})}",
+        warnings=list(warnings)
+    )
+
+
+# =========================
+# Assignment Endpoint
+# =========================
+@app.post("/api/assignments", response_model=GenerationResponse)
+async def create_assignment(
+    syllabus: UploadFile = File(...),
+    subject: str = Form(...),
+    department: str = Form("CSE"),
+    semester: str = Form("VIII"),
+    academic_year: str = Form("2025-26"),
+    year_div: str = Form("B.TECH"),
+    assignment_no: str = Form("03"),
+    teacher_name: str = Form(""),
+    max_marks: str = Form("60"),
+    subject_incharge: str = Form(""),
+    academic_coordinator: str = Form(""),
+    hod_name: str = Form(""),
+    question_count: int = Form(5, ge=1, le=50),
+    pct_understand: int = Form(30, ge=0, le=100),
+    pct_apply: int = Form(30, ge=0, le=100),
+    pct_analyze_eval: int = Form(40, ge=0, le=100),
+    total_cos: int = Form(6, ge=1, le=20),
+    total_pos: int = Form(12, ge=1, le=20),
+    marks_understand: int = Form(3, ge=1, le=20),
+    marks_apply: int = Form(5, ge=1, le=20),
+    marks_analyze_eval: int = Form(7, ge=1, le=20),
+    relabel: bool = Form(False)
+):
+    upload = await read_upload(syllabus)
+    syllabus_text = await run_in(render_pool, extract_text, upload)
+
+    pct_u, pct_a, pct_ae = normalize_bloom_percentages(pct_understand, pct_apply, pct_analyze_eval)
+    pairs = await run_in(
+        generation_pool, generate_questions, subject, syllabus_text, question_count, pct_u, pct_a, pct_ae
+    )
+    if relabel:
+        pairs = await run_in(render_pool, relabel_pairs, pairs)
+
+    questions_list = [q for (q, b) in pairs][:question_count]
+    bloom_labels = [b for (q, b) in pairs][:question_count]
+    row_settings = (total_cos, total_pos, marks_understand, marks_apply, marks_analyze_eval)
+
+    warnings = []
+    if len(questions_list) < question_count:
+        warnings.append(f"The model returned {len(questions_list)} of {question_count} requested questions.")
+
+    today = datetime.date.today()
+    data = {
+        "{{DEPARTMENT}}": department,
+        "{{SEMESTER}}": semester,
+        "{{ACADEMIC_YEAR}}": academic_year,
+        "{{YEAR_DIV}}": year_div,
+        "{{MAX_MARKS}}": max_marks,
+        "{{SUBJECT}}": subject,
+        "{{ASSIGNMENT_NO}}": assignment_no,
+        "{{TEACHER_NAME}}": teacher_name,
+        "{{DATE}}": today,
+        "{{SUBMISSION_DATE}}": today,
+        "{{SUBJECT_INCHARGE}}": subject_incharge,
+        "{{ACADEMIC_COORDINATOR}}": academic_coordinator,
+        "{{HOD_NAME}}": hod_name
+    }
+
+    docx_bytes = await run_in(
+        render_pool,
+        lambda: generate_university_docx(data, questions_list, bloom_labels, *row_settings)
+    )
+
+    rows = [
+        assignment_row(i, q, bloom_labels[i - 1], *row_settings)
+        for i, q in enumerate(questions_list, start=1)
+    ]
+    bloom_warning = mismatch_warning(await run_in(render_pool, bloom_mismatches, rows))
+    if bloom_warning:
+        warnings.append(bloom_warning)
+
+    document_id = await store_document(docx_bytes)
+    return generation_response(rows, document_id, assignment_file_name(subject), warnings)
+
+
+# =========================
+# Question Paper Endpoint
+# =========================
+@app.post("/api/question-papers", response_model=GenerationResponse)
+async def create_question_paper(
+    unit1: UploadFile = File(...),
+    unit2: UploadFile = File(...),
+    unit3: UploadFile = File(...),
+    unit4: UploadFile = File(...),
+    unit5: UploadFile = File(...),
+    course_name: str = Form(...),
+    course_code: str = Form(...),
+    subject_teacher: str = Form(...),
+    department: str = Form("CSE"),
+    semester: str = Form("VIII"),
+    academic_year: str = Form("2025-26"),
+    duration: str = Form("2 Hours"),
+    total_marks: str = Form("48"),
+    subject_incharge: str = Form(""),
+    academic_coordinator: str = Form(""),
+    hod_name: str = Form(""),
+    total_cos: int = Form(6, ge=1, le=20),
+    total_pos: int = Form(12, ge=1, le=20)
+):
+    unit_files = [await read_upload(u) for u in (unit1, unit2, unit3, unit4, unit5)]
+
+    # Parse every unit up front on the render pool. The section pipeline's own
+    # extract_text calls then hit the extraction cache instead of re-parsing.
+    await asyncio.gather(*(run_in(render_pool, extract_text, f) for f in unit_files))
+
+    section_results, section_errors = await run_in(
+        generation_pool, generate_paper_sections, course_name, question_paper_section_specs(unit_files)
+    )
+    if section_errors:
+        raise HTTPException(
+            status_code=502,
+            detail={f"Section {name}": error for name, error in sorted(section_errors.items())}
+        )
+
+    rows = build_question_paper_rows(section_results, total_cos, total_pos)
+    bloom_warning = mismatch_warning(await run_in(render_pool, bloom_mismatches, rows))
+
+    today = datetime.date.today()
+    qp_data = {
+        "department": department,
+        "semester": semester,
+        "academic_year": academic_year,
+        "course_name": course_name,
+        "course_code": course_code,
+        "subject_teacher": subject_teacher,
+        "duration": duration,
+        "total_marks": total_marks,
+        "date": today,
+        "exam_date": today,
+        "subject_incharge": subject_incharge,
+        "academic_coordinator": academic_coordinator,
+        "hod_name": hod_name
+    }
+
+    docx_bytes = await run_in(render_pool, generate_question_paper_docx, qp_data, rows)
+    document_id = await store_document(docx_bytes)
+    return generation_response(rows, document_id, question_paper_file_name(), [bloom_warning] if bloom_warning else [])
+
+
+# =========================
+# Downloads
+# =========================
+@app.get("/api/documents/{document_id}", name="download_document")
+async def download_document(document_id: str, filename: str = ""):
+    if not re.fullmatch(r"[0-9a-f]{64}", document_id):
+        raise HTTPException(status_code=404, detail="Unknown document")
+
+    data = await run_in(render_pool, get_artifact_store().get, document_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired document")
+
+    file_name = re.sub(r"[^A-Za-z0-9_.-]", "", filename) or f"BloomGen_{document_id[:8]}.docx"
+    return Response(
+        content=data,
+        media_type=DOCX_MIME,
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'}
+    )
+
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
@@ -0,0 +1,234 @@
+# Run tracing: wall time of each pipeline stage (extract, split, summarize,
+# generate, render) and of every LLM call, with token usage from the response
+# metadata, retries and cache hits. Records are grouped per run (a background
+# job, an API request, a batch course) and appended to a JSON-lines file when
+# the run ends; Run.profile() is the per-stage breakdown the sidebar shows.
+#
+# Off unless BLOOMGEN_TRACE=1. When off, stage() returns functions undecorated
+# and span()/llm_span() hand back one shared no-op, so traced code pays a
+# single flag check.
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+
+from bloomgen.cache import CACHE_DIR
+
+# =========================
+# Trace Settings
+# =========================
+TRACE_ENABLED = os.getenv("BLOOMGEN_TRACE", "0") == "1"
+TRACE_FILE = os.getenv("BLOOMGEN_TRACE_FILE", os.path.join(CACHE_DIR, "trace.jsonl"))
+# USD per million tokens, for the cost column; set them to match your plan.
+PRICE_INPUT_PER_MTOK = float(os.getenv("BLOOMGEN_PRICE_INPUT_PER_MTOK", "0.15"))
+PRICE_OUTPUT_PER_MTOK = float(os.getenv("BLOOMGEN_PRICE_OUTPUT_PER_MTOK", "0.75"))
+
+COUNTERS = ["prompt_tokens", "completion_tokens", "retries", "cache_hits", "cache_misses"]
+
+_current = contextvars.ContextVar("bloomgen_trace_run", default=None)
+_file_lock = threading.Lock()
+
+
+# =========================
+# Runs and Spans
+# =========================
+class Run:
+    def __init__(self, kind, run_id=None):
+        self.kind = kind
+        self.id = run_id or uuid.uuid4().hex
+        self.records = []
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def profile(self):
+        # One row per (stage, name). Stages nest (generate contains summarize and
+        # llm), so their seconds overlap rather than add up to the run time.
+        rows = {}
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            row = rows.setdefault((record["stage"], record["name"]), {
+                "stage": record["stage"], "name": record["name"], "calls": 0, "seconds": 0.0,
+                **dict.fromkeys(COUNTERS, 0)
+            })
+            row["calls"] += 1
+            row["seconds"] += record["seconds"]
+            for counter in COUNTERS:
+                row[counter] += record.get(counter, 0)
+
+        for row in rows.values():
+            row["seconds"] = round(row["seconds"], 3)
+            row["cost_usd"] = round(
+                (row["prompt_tokens"] * PRICE_INPUT_PER_MTOK + row["completion_tokens"] * PRICE_OUTPUT_PER_MTOK) / 1e6, 6
+            )
+        return sorted(rows.values(), key=lambda r: -r["seconds"])
+
+
+class Span:
+    def __init__(self, run, record):
+        self.run = run
+        self.record = record
+        self.config = None
+        self._started = 0.0
+
+    def set(self, **attrs):
+        self.record.update(attrs)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.record["seconds"] = time.perf_counter() - self._started
+        if exc_type is not None:
+            self.record["error"] = exc_type.__name__
+        self.run.add(self.record)
+        return False
+
+
+class NullSpan:
+    config = None
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+def span(stage, name="", **attrs):
+    current = _current.get() if TRACE_ENABLED else None
+    if current is None:
+        return NULL_SPAN
+    return Span(current, {
+        "run": current.id, "kind": current.kind, "stage": stage, "name": name or stage, "start": time.time(), **attrs
+    })
+
+
+def stage(stage_name):
+    # Decorator form of span(), named after the function.
+    def decorate(fn):
+        if not TRACE_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def traced(*args, **kwargs):
+            with span(stage_name, fn.__name__):
+                return fn(*args, **kwargs)
+        return traced
+    return decorate
+
+
+@contextlib.contextmanager
+def run(kind, run_id=None):
+    if not TRACE_ENABLED:
+        yield None
+        return
+
+    current = Run(kind, run_id)
+    token = _current.set(current)
+    try:
+        yield current
+    finally:
+        _current.reset(token)
+        write_run(current)
+
+
+def bind(fn):
+    # Thread pools do not carry context variables across; this carries the current run.
+    current = _current.get() if TRACE_ENABLED else None
+    if current is None:
+        return fn
+
+    def bound(*args, **kwargs):
+        token = _current.set(current)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return bound
+
+
+def write_run(current):
+    if not current.records:
+        return
+    lines = "".join(json.dumps(record, default=str) + "\n" for record in current.records)
+    os.makedirs(os.path.dirname(os.path.abspath(TRACE_FILE)), exist_ok=True)
+    with _file_lock:
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+# =========================
+# LLM Calls
+# =========================
+_usage_handler_class = None
+_usage_handler_lock = threading.Lock()
+
+
+def usage_handler():
+    # The callback class is built on the first traced LLM call, so importing
+    # this module (which every stage does) never loads langchain_core.
+    global _usage_handler_class
+    with _usage_handler_lock:
+        if _usage_handler_class is None:
+            from langchain_core.callbacks import BaseCallbackHandler
+
+            class UsageHandler(BaseCallbackHandler):
+                # Sums token usage over the chat model calls a chain makes.
+                def __init__(self):
+                    self.prompt_tokens = 0
+                    self.completion_tokens = 0
+
+                def on_llm_end(self, response, **kwargs):
+                    for generations in response.generations:
+                        for generation in generations:
+                            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                            if usage:
+                                self.prompt_tokens += usage.get("input_tokens", 0)
+                                self.completion_tokens += usage.get("output_tokens", 0)
+                                return
+
+                    token_usage = (response.llm_output or {}).get("token_usage") or {}
+                    self.prompt_tokens += token_usage.get("prompt_tokens", 0)
+                    self.completion_tokens += token_usage.get("completion_tokens", 0)
+
+            _usage_handler_class = UsageHandler
+    return _usage_handler_class()
+
+
+class LLMSpan(Span):
+    def __init__(self, run, record):
+        super().__init__(run, record)
+        self.usage = usage_handler()
+        self.config = {"callbacks": [self.usage]}
+
+    def __exit__(self, exc_type, exc, tb):
+        self.record["prompt_tokens"] = self.usage.prompt_tokens
+        self.record["completion_tokens"] = self.usage.completion_tokens
+        return super().__exit__(exc_type, exc, tb)
+
+
+def llm_span(chain, estimated_tokens):
+    # span.config goes to chain.invoke/stream so the usage handler sees the model's reply.
+    current = _current.get() if TRACE_ENABLED else None
+    if current is None:
+        return NULL_SPAN
+    name = (getattr(chain, "config", None) or {}).get("run_name", "llm")
+    return LLMSpan(current, {
+        "run": current.id, "kind": current.kind, "stage": "llm", "name": name, "start": time.time(),
+        "estimated_tokens": estimated_tokens, "retries": 0
+    })